@@ -0,0 +1,52 @@
+#! /usr/bin/env python3
+
+"""Микробенчмарк накладных расходов вызова функций драйвера через
+IDaqZDevice: прежняя схема (связывание символа и partial на каждый вызов)
+против однократного связывания.
+
+Вместо Zadc.dll используется подставная библиотека из ctypes-callback'ов,
+поэтому измеряется только стоимость обертки и FFI.
+"""
+
+from __future__ import annotations
+
+import timeit
+from ctypes import byref, c_long
+from functools import partial
+from typing import cast
+
+from standin import StandInBackend
+
+from zet.client import IDaqZDevice, ZetError
+
+
+class LegacyDevice(IDaqZDevice):
+    """Прежняя схема: новый partial и новый объект функции на каждый вызов."""
+
+    def _call(self, name: str, *arguments: object) -> bool:
+        backend = cast(StandInBackend, self.backend)
+        if ret := backend.resolve(name, self._functions_[name])(self.device, self.dsp, *arguments):
+            msg = f"{name} error {ret:04X}"
+            raise ZetError(msg)
+
+        return True
+
+    def __getattr__(self, name: str):
+        return partial(self._call, name)
+
+
+def calls_per_second(zdev: IDaqZDevice, number: int) -> float:
+    ptr = c_long()
+    seconds = timeit.timeit(lambda: zdev.ZGetPointerADC(byref(ptr)), number=number)
+    return number / seconds
+
+
+if __name__ == "__main__":
+    number = 200000
+
+    before = calls_per_second(LegacyDevice(0, 0, backend=StandInBackend()), number)
+    after = calls_per_second(IDaqZDevice(0, 0, backend=StandInBackend()), number)
+
+    print(f"ZGetPointerADC before: {before:12.0f} calls/s")
+    print(f"ZGetPointerADC after:  {after:12.0f} calls/s")
+    print(f"speedup:               {after / before:12.2f}x")
@@ -0,0 +1,233 @@
+#! /usr/bin/env python3
+
+"""Набор бенчмарков основных путей работы с ZET без оборудования.
+
+Измеряются:
+    call      - накладные расходы вызова функций драйвера (подставная
+                библиотека standin, через FFI);
+    read      - чтение кольцевого буфера АЦП с копированием блока при
+                1..32 каналах (указатель драйвера сдвигается бенчмарком);
+    convert   - перевод кодов АЦП в вольты (Converter);
+    dac       - запись блоков в буфер ЦАП (DacWriter);
+    loop      - загрузка процессора циклом сбора данных с модели
+                устройства (zet.simulator) в реальном времени.
+
+Результаты выводятся в формате JSON (список записей name/params/value/
+unit/higher). С --baseline результаты сравниваются с сохраненными ранее;
+при ухудшении больше чем на --tolerance код завершения равен 1.
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --baseline results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from ctypes import byref, c_long
+from typing import Any, Dict, Iterator
+
+import numpy as np
+from standin import StandInBackend
+
+from zet.client import ZET, Z_DEVICE, IDaqZDevice
+from zet.convert import Converter
+from zet.dac import DacWriter
+from zet.simulator import SimDevice, SimulatorBackend
+from zet.stream import AdcStream
+
+Result = Dict[str, Any]
+CHANNELS = (1, 2, 4, 8, 16, 32)
+
+
+def result(name: str, value: float, unit: str, higher: bool = True, **params: Any) -> Result:
+    return {"name": name, "params": params, "value": value, "unit": unit, "higher": higher}
+
+
+class ManualDevice(SimDevice):
+    """Модель устройства, указатель АЦП которой задается бенчмарком."""
+
+    def __init__(self, channels: int, frames: int) -> None:
+        super().__init__(quantity_adc=max(CHANNELS), words_adc=2, list_freq_adc=(1.0,))
+        self.params["InputADC"] = [int(channel < channels) for channel in range(max(CHANNELS))]
+        self.params["BufferSizeADC"] = frames * channels * 2
+        self.pointer = 0
+
+    def ZGetPointerADC(self, out: Any) -> None:
+        out._obj.value = self.pointer
+
+
+def bench_call(number: int) -> Iterator[Result]:
+    ptr = c_long()
+    zdev = IDaqZDevice(0, 0, backend=StandInBackend())
+    seconds = timeit.timeit(lambda: zdev.ZGetPointerADC(byref(ptr)), number=number)
+    yield result("call", seconds / number * 1e9, "ns/call", False, path="IDaqZDevice")
+
+    seconds = timeit.timeit(lambda: zdev("ZGetPointerADC", byref(ptr)), number=number)
+    yield result("call", seconds / number * 1e9, "ns/call", False, path="__call__")
+
+    client = ZET(0, 0, backend=StandInBackend())
+    seconds = timeit.timeit(client.ZGetPointerADC, number=number)
+    yield result("call", seconds / number * 1e9, "ns/call", False, path="ZET")
+
+
+def bench_read(samples: int) -> Iterator[Result]:
+    frames = 1 << 16
+    for channels in CHANNELS:
+        device = ManualDevice(channels, frames)
+        zdev = ZET(Z_DEVICE.ZET230, 0, backend=SimulatorBackend({(Z_DEVICE.ZET230, 0): device}))
+        zdev.ZOpen()
+        stream = AdcStream(zdev)
+        stream.poll()
+
+        step = frames * channels // 4 + channels // 2     # блоки то и дело разрываются концом буфера
+        rounds = max(samples // step, 1)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            device.pointer = (device.pointer + step * 2) % (frames * channels * 2)
+            if (block := stream.read()) is not None:    # указатель сдвинут - блок есть всегда
+                block.data()
+        seconds = time.perf_counter() - start
+        del block
+
+        read = stream.lag + rounds * step
+        yield result("read", read / seconds, "samples/s", channels=channels)
+        yield result("read", read * 4 / seconds / 1e6, "MB/s", channels=channels)
+        stream.close()
+        zdev.ZClose()
+
+
+def bench_convert(samples: int) -> Iterator[Result]:
+    for channels in (1, 4, 32):
+        codes = np.random.default_rng(0).integers(-1 << 23, 1 << 23, (samples // channels, channels),
+                                                  dtype=np.int32)
+        converter = Converter(np.full(channels, 1e-6))
+        for dtype in (np.float32, np.float64):
+            out = np.empty(codes.shape, dtype)
+            seconds = min(timeit.repeat(lambda: converter.convert(codes, out), number=1, repeat=5))
+            yield result("convert", codes.size / seconds, "samples/s",
+                         channels=channels, dtype=np.dtype(dtype).name, kernel="convert")
+
+            out = np.empty(codes.shape[::-1], dtype)
+            seconds = min(timeit.repeat(lambda: converter.deinterleave(codes, out), number=1, repeat=5))
+            yield result("convert", codes.size / seconds, "samples/s",
+                         channels=channels, dtype=np.dtype(dtype).name, kernel="deinterleave")
+
+
+def bench_dac(samples: int) -> Iterator[Result]:
+    for channels in (1, 2):
+        zdev = ZET(Z_DEVICE.ZET230, 0, backend=SimulatorBackend())
+        zdev.ZOpen()
+        for channel in range(channels):
+            zdev.ZSetOutputDAC(channel, 1)
+        writer = DacWriter(zdev)
+
+        block = np.sin(np.linspace(0.0, 100.0, 4096))
+        rounds = max(samples // len(block), 1)
+        seconds = timeit.timeit(lambda: writer.write(block), number=rounds)
+        yield result("dac", rounds * len(block) / seconds, "frames/s", channels=channels)
+
+        writer.close()
+        zdev.ZClose()
+
+
+def bench_loop(duration: float) -> Iterator[Result]:
+    for channels in (4, 16):
+        device = SimDevice(quantity_adc=channels, signal=lambda t, channel: np.zeros_like(t))
+        freq = max(device.lists["FreqADC"])
+        zdev = ZET(Z_DEVICE.ZET230, 0, backend=SimulatorBackend({(Z_DEVICE.ZET230, 0): device}))
+        zdev.ZOpen()
+        zdev.ZSetFreqADC(freq)
+        for channel in range(channels):
+            zdev.ZSetInputADC(channel, 1)
+
+        stream = AdcStream(zdev, resync=True)
+        converter = Converter.from_device(zdev)
+        stream.poll()
+        zdev.ZStartADC()
+
+        frames = 0
+        start, cpu = time.perf_counter(), time.process_time()
+        while time.perf_counter() - start < duration:
+            block = next(stream)
+            converter.deinterleave(block)
+            frames += len(block)
+        del block
+        seconds, cpu = time.perf_counter() - start, time.process_time() - cpu
+
+        yield result("loop", cpu / seconds * 100.0, "% CPU", False,
+                     channels=channels, freq=freq, note="includes simulator")
+        yield result("loop", frames / seconds, "frames/s", channels=channels, freq=freq)
+        yield result("loop", stream.overruns, "overruns", False, channels=channels, freq=freq)
+
+        zdev.ZStopADC()
+        stream.close()
+        zdev.ZClose()
+
+
+def compare(results: list[Result], baseline: list[Result], tolerance: float) -> list[str]:
+    """Описания результатов, ухудшившихся относительно baseline больше чем на tolerance."""
+
+    def key(item: Result) -> str:
+        return json.dumps([item["name"], item["unit"], item["params"]], sort_keys=True)
+
+    previous = {key(item): item for item in baseline}
+    regressions = []
+    for item in results:
+        if (old := previous.get(key(item))) is None or not old["value"]:
+            continue
+        change = item["value"] / old["value"] - 1.0
+        if (change < -tolerance) if item["higher"] else (change > tolerance):
+            regressions.append(f"{item['name']} {item['params']}: {old['value']:.4g} -> "
+                               f"{item['value']:.4g} {item['unit']} ({change:+.1%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=("call", "read", "convert", "dac", "loop"))
+    parser.add_argument("--quick", action="store_true", help="короткие прогоны")
+    parser.add_argument("--output", help="файл для сохранения результатов (JSON)")
+    parser.add_argument("--baseline", help="файл с результатами для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение")
+    args = parser.parse_args()
+
+    scale = 0.1 if args.quick else 1.0
+    benches = {"call": lambda: bench_call(int(200000 * scale)),
+               "read": lambda: bench_read(int(20000000 * scale)),
+               "convert": lambda: bench_convert(int(4000000 * scale)),
+               "dac": lambda: bench_dac(int(4000000 * scale)),
+               "loop": lambda: bench_loop(2.0 * scale)}
+
+    results = []
+    for name in args.only or benches:
+        for item in benches[name]():
+            print(f"{item['name']:8} {item['value']:14.4g} {item['unit']:10} {item['params']}",
+                  file=sys.stderr)
+            results.append(item)
+
+    report = {"python": platform.python_version(), "numpy": np.__version__,
+              "machine": platform.machine(), "results": results}
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return int(bool(regressions))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
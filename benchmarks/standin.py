@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+
+"""Подставная библиотека для запуска бенчмарков без Zadc.dll.
+
+Каждая функция из IDaqZDevice._functions_ заменяется ctypes-callback'ом
+того же прототипа: вызов проходит через настоящий FFI, но не требует
+драйвера и оборудования.
+"""
+
+from __future__ import annotations
+
+from ctypes import c_void_p, cast
+from typing import TYPE_CHECKING, Any, Callable
+
+from zet.backend import Backend
+
+if TYPE_CHECKING:
+    from _ctypes import CFuncPtr, _PyCFuncPtrType
+
+values = {"ZGetPointerADC": 1, "ZGetPointerDAC": 2}     # значения выходного аргумента
+errors = {"ZGetFlag": 0x0F}                             # функции, возвращающие ошибку
+
+
+def _stand_in(name: str) -> Callable[..., int]:
+    value = values.get(name, 0)
+    error = errors.get(name, 0)
+
+    def func(device: int, dsp: int, *arguments: Any) -> int:
+        if arguments and hasattr(arguments[-1], "contents"):
+            arguments[-1][0] = value
+        return error
+
+    return func
+
+
+class StandInBackend(Backend):
+    """Источник функций драйвера на основе подставной библиотеки."""
+
+    def __init__(self) -> None:
+        self._callbacks: dict[str, CFuncPtr] = {}
+        self._bound: dict[str, CFuncPtr] = {}
+
+    def resolve(self, name: str, prototype: _PyCFuncPtrType) -> CFuncPtr:
+        """Создать новый объект функции (как при связывании символа библиотеки)."""
+
+        if (callback := self._callbacks.get(name)) is None:
+            callback = self._callbacks[name] = prototype(_stand_in(name))
+        return prototype(cast(callback, c_void_p).value)
+
+    def bind(self, name: str, prototype: _PyCFuncPtrType) -> CFuncPtr:
+        if (func := self._bound.get(name)) is None:
+            func = self._bound[name] = self.resolve(name, prototype)
+        return func
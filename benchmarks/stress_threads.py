@@ -0,0 +1,64 @@
+#! /usr/bin/env python3
+
+"""Нагрузочная проверка параллельной работы нескольких потоков с одним ZET.
+
+Потоки одновременно опрашивают ZGetPointerADC/ZGetPointerDAC и вызывают
+завершающийся ошибкой ZGetFlag. Каждый поток проверяет, что выполнилась
+именно запрошенная функция и что ZetError содержит ее имя.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+from standin import StandInBackend, values
+
+from zet.client import ZET, ZetError
+
+
+def worker(zdev: ZET, method: str, number: int, failures: list[str]) -> None:
+    expected = values.get(method)
+
+    for _ in range(number):
+        if method == "ZGetFlag":
+            try:
+                zdev.ZGetFlag()
+            except ZetError as err:
+                if not str(err).startswith("ZGetFlag "):
+                    failures.append(f"{method}: {err}")
+            else:
+                failures.append(f"{method}: no error")
+        elif (value := getattr(zdev, method)()) != expected:
+            failures.append(f"{method}: got {value}, expected {expected}")
+
+
+def run(locked: bool, threads: int, number: int) -> list[str]:
+    zdev = ZET(device=0, dsp=0, locked=locked, backend=StandInBackend())
+
+    methods = ("ZGetPointerADC", "ZGetPointerDAC", "ZGetFlag")
+    failures: list[str] = []
+    pool = [threading.Thread(target=worker, args=(zdev, methods[i % len(methods)], number, failures))
+            for i in range(threads)]
+
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"locked={locked!s:5} threads={threads} calls={threads * number} "
+          f"time={elapsed:.2f}s failures={len(failures)}")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.setswitchinterval(1e-6)     # максимально частое переключение потоков
+
+    failures = run(locked=False, threads=12, number=20000) + \
+               run(locked=True, threads=12, number=20000)
+    for failure in failures[:10]:
+        print(failure)
+    sys.exit(1 if failures else 0)
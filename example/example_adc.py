@@ -3,9 +3,10 @@
 """Пример использования библиотеки."""
 
 import contextlib
-from time import sleep
 
 from zet.client import Z_DEVICE, ZET
+from zet.convert import Converter
+from zet.stream import AdcStream
 
 if __name__ == "__main__":
     with ZET(device=Z_DEVICE.ZET230, dsp=0) as zdev:    # либо zdev.ZOpen() в начале и zdev.ZClose() в конце
@@ -14,31 +15,24 @@ if __name__ == "__main__":
         print(f"ZGetDigitalResolChanADC = {resolution}")
         amplify = zdev.ZGetAmplifyADC(channel=0)
         print(f"ZGetAmplifyADC = {amplify}")
-        channels = zdev.ZGetNumberInputADC()
-        print(f"ZGetNumberInputADC = {channels}")
-        words = zdev.ZGetWordsADC()
-        print(f"ZGetWordsADC = {words}")
-        buff, size = zdev.ZGetBufferADC()
-        print(f"ZGetBufferADC = {buff}, {size}")
-        print(f"ZStartADC = {zdev.ZStartADC()}")
-
-        pointer_old = 0
-        with contextlib.suppress(KeyboardInterrupt):
-            while True:
-                pointer = zdev.ZGetPointerADC()
+        print(f"ZGetNumberInputADC = {zdev.ZGetNumberInputADC()}")
+        print(f"ZGetWordsADC = {zdev.ZGetWordsADC()}")
 
-                if pointer == pointer_old:
-                    continue
-                pointer_old = pointer
+        converter = Converter.from_device(zdev)     # коэффициенты включенных каналов
 
-                condition = pointer - words * channels
-                pointer = size + condition if condition < 0 else condition
+        stream = AdcStream(zdev)    # буфер АЦП запрашивается потоком
+        print(f"ZGetBufferADC = {stream.buff.ptr}, {stream.buff.size}")
+        print(f"ZStartADC = {zdev.ZStartADC()}")
 
-                volt0 = resolution * buff[pointer // words] / amplify
+        block = None
+        with contextlib.suppress(KeyboardInterrupt):
+            for block in stream:
+                volts = converter.deinterleave(block)
+                volt0 = volts[0, -1]
 
-                print(f"pointer = {pointer:7d}, volts = {volt0:.05f}", end="\r")
-                sleep(0.02)
+                print(f"frame = {block.index + len(block):9d}, volts = {volt0:.05f}", end="\r")
 
         print()
         print(f"ZStopADC = {zdev.ZStopADC()}")
-        print(f"ZRemBufferADC = {zdev.ZRemBufferADC(buff)}")
+        del block           # блок ссылается на память буфера, которая сейчас будет освобождена
+        stream.close()      # ZRemBufferADC
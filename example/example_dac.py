@@ -3,21 +3,10 @@
 """Пример записи синусоидального сигнала в 1-ый канал ЦАП."""
 
 import contextlib
-from math import pi, sin
 from time import sleep
 
 from zet.client import Z_DEVICE, ZET
-
-
-def sinus_generator(words, buff, amplitude, current_sine_time, delta_sine_time, size, pointer_cycle):
-    for i in range(size):
-        volt0 = amplitude * sin(current_sine_time)
-        buff[pointer_cycle // words + i] = int(volt0)
-        current_sine_time += delta_sine_time
-
-    pointer_cycle += words * size
-    return current_sine_time, pointer_cycle
-
+from zet.dac import DacFeeder, DacWriter, Sine
 
 if __name__ == "__main__":
     with ZET(device=Z_DEVICE.ZET230, dsp=0) as zdev:    # либо zdev.ZOpen() в начале и zdev.ZClose() в конце
@@ -25,68 +14,32 @@ if __name__ == "__main__":
         print(f"ZSetOutputDAC = {zdev.ZSetOutputDAC(channel=0, enable=True)}")
         print(f"ZGetNumberOutputDAC = {zdev.ZGetNumberOutputDAC()}")
 
-        resolution = zdev.ZGetDigitalResolutionDAC()
-        print(f"ZGetDigitalResolutionDAC = {resolution}")
-        words = zdev.ZGetWordsDAC()
-        print(f"ZGetWordsDAC = {words}")
-        freq = zdev.ZGetFreqDAC()
-        print(f"ZGetFreqDAC = {freq}")
-        size_interrupt_buffer_dac = zdev.ZGetInterruptDAC()
-        print(f"ZGetInterruptDAC = {size_interrupt_buffer_dac}")
+        print(f"ZGetDigitalResolutionDAC = {zdev.ZGetDigitalResolutionDAC()}")
+        print(f"ZGetWordsDAC = {zdev.ZGetWordsDAC()}")
+        print(f"ZGetFreqDAC = {zdev.ZGetFreqDAC()}")
+        print(f"ZGetInterruptDAC = {zdev.ZGetInterruptDAC()}")
         atten_dac0 = zdev.ZSetAttenDAC(channel=0, reduction=0.1)
         print(f"ZSetAttenDAC = {atten_dac0}")
-        buff, size_buffer_dac = zdev.ZGetBufferDAC()
-        print(f"ZGetBufferDAC = {buff}, {size_buffer_dac}")
-
-        amplitude = 1.0         # Амплитуда синусоидального сигнала (Водьты)
-        freq_sine = 1.0         # Частота синусоидального сигнала (Гц)
-
-        current_sine_time = 0.0
-        response_time = 250.0
-
-        size_packet = max(int(freq * response_time / 1000.0 * words), size_interrupt_buffer_dac * 2)
-        size_packet = min(size_packet, size_buffer_dac // 2)
-
-        amplitude /= resolution * atten_dac0
-        delta_sine_time = 2.0 * pi * freq_sine / freq
 
-        size = int(2.0 * size_packet / words)
-        current_sine_time, _ = sinus_generator(words, buff, amplitude, current_sine_time, delta_sine_time, size, 0)
+        writer = DacWriter(zdev)        # буфер ЦАП запрашивается объектом записи
+        print(f"ZGetBufferDAC = {writer.buff.ptr}, {writer.buff.size}")
 
-        pointer_cycle = 2 * size_packet
+        sine = Sine(freq=1.0, amplitude=1.0)    # Частота (Гц) и амплитуда (Вольты) сигнала
+        feeder = DacFeeder(writer, sine, latency=0.25)
+        print(f"packet = {feeder.packet}, low = {feeder.low}, high = {feeder.high}")
+        feeder.prime()
 
         print(f"ZStartDAC = {zdev.ZStartDAC()}")
         print(f"ZStartADC = {zdev.ZStartADC()}")
 
-        pointer_old = 0
-        with contextlib.suppress(KeyboardInterrupt):
+        with contextlib.suppress(KeyboardInterrupt), feeder:    # подкачка в фоновом потоке
             while True:
-                sleep(0.02)
-
-                pointer = zdev.ZGetPointerDAC()
-                print(f"pointer = {pointer:7d}, pointer_cycle = {pointer_cycle:7d}", end="\r")
-
-                if ((pointer_cycle - pointer > size_packet) or (pointer > pointer_cycle and
-                    size_buffer_dac - pointer + pointer_cycle > size_packet)):
-                    continue
-
-                pointer_old = pointer
-                size = size_packet
-
-                if pointer_cycle + size_packet > size_buffer_dac:
-                    size = size_buffer_dac - pointer_cycle
-                size //= words
-
-                current_sine_time, pointer_cycle = sinus_generator(words, buff, amplitude, current_sine_time, delta_sine_time, size, pointer_cycle)
-
-                if pointer_cycle >= size_buffer_dac:
-                    pointer_cycle = 0
-
-                if size < size_packet / words:
-                    size = int(size_packet / words - size)
+                sleep(1.0)
 
-                    current_sine_time, pointer_cycle = sinus_generator(words, buff, amplitude, current_sine_time, delta_sine_time, size, pointer_cycle)
+                stats = feeder.stats()
+                print(f"refills = {stats['refills']:7d}, underruns = {stats['underruns']:3d}, "
+                      f"buffered = {stats['buffered']:7d}, late_max = {stats['late_max']:.04f}", end="\r")
         print()
         print(f"ZStopDAC = {zdev.ZStopDAC()}")
         print(f"ZStopADC = {zdev.ZStopADC()}")
-        print(f"ZRemBufferDAC = {zdev.ZRemBufferDAC(buff)}")
+        writer.close()      # ZRemBufferDAC
@@ -0,0 +1,28 @@
+#! /usr/bin/env python3
+
+"""Пример раздачи данных АЦП по сети (вместо устройства - симулятор)."""
+
+import contextlib
+
+from zet.client import Z_DEVICE, ZET
+from zet.server import StreamClient, StreamServer
+from zet.simulator import SimulatorBackend
+
+if __name__ == "__main__":
+    with ZET(device=Z_DEVICE.ZET230, dsp=0, backend=SimulatorBackend()) as zdev:   # без backend - Zadc.dll
+        zdev.ZSetInputADC(channel=0, enable=True)
+        zdev.ZSetInputADC(channel=1, enable=True)
+        zdev.ZSetFreqADC(freq=25000)
+
+        with StreamServer(zdev, ("127.0.0.1", 0)) as server:     # порт выбирается системой
+            print(f"address = {server.address}")
+
+            # Канал 1 в вольтах с прореживанием в 25 раз (1000 кадров в секунду)
+            with StreamClient(server.address, channels=[1], decimation=25, volts=True) as client:
+                print(f"freq = {client.header.freq}, channels = {client.header.channels}")
+                with contextlib.suppress(KeyboardInterrupt):
+                    for packet in client:
+                        print(f"frame = {packet.index:9d}, volts = {packet.data[-1, 0]:.05f}, "
+                              f"dropped = {packet.dropped}", end="\r")
+
+        print()
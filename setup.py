@@ -11,6 +11,7 @@ setup(name="python-zetlab",
       license="MIT",
       packages=["zet", "zet.libs"],
       package_data={"zet": ["libs/*.dll"]},
+      install_requires=["numpy"],
       platforms=["Windows"],
       classifiers=["Development Status :: 3 - Alpha",
                    "Intended Audience :: Science/Research",
@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+
+"""Асинхронный (asyncio) интерфейс для работы с устройствами ZetLab."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, TypeVar
+
+from zet.client import ZET
+from zet.stream import AdcStream
+
+if TYPE_CHECKING:
+    from zet.backend import Backend
+    from zet.dac import DacWriter, Generators
+    from zet.stream import Block
+
+T = TypeVar("T")
+
+
+class AsyncZET:
+    """Асинхронная обертка над ZET.
+
+    Все вызовы драйвера выполняются в отдельном потоке-исполнителе,
+    принадлежащем устройству, поэтому они не блокируют цикл событий и
+    выполняются строго последовательно. Любой метод ZET доступен как
+    сопрограмма: await adev.ZGetFreqADC().
+    """
+
+    def __init__(self, device: int, dsp: int, locked: bool = False,
+                       backend: Backend | None = None) -> None:
+        """Инициализация класса клиента с указанными параметрами."""
+
+        self.zdev = ZET(device, dsp, locked, backend)
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix=f"ZET-{device}-{dsp}")
+
+    async def __aenter__(self) -> AsyncZET:
+        """Входной блок асинхронного контекстного менеджера."""
+
+        await self.ZOpen()
+        return self
+
+    async def __aexit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        """Выходной блок асинхронного контекстного менеджера."""
+
+        try:
+            await self.ZClose()
+        finally:
+            self.close()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        method = getattr(self.zdev, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(method, *args, **kwargs)
+
+        setattr(self, name, call)
+        return call
+
+    def close(self) -> None:
+        """Остановить поток-исполнитель устройства."""
+
+        self._executor.shutdown(wait=True)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Выполнить func в потоке-исполнителе устройства."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def stream_adc(self, **kwargs: Any) -> AsyncAdcStream:
+        """Создать асинхронный поток данных АЦП (параметры как у AdcStream)."""
+
+        return AsyncAdcStream(self, await self.run(AdcStream, self.zdev, **kwargs))
+
+    async def fill_dac(self, writer: DacWriter, generator: Generators, frames: int) -> int:
+        """Сгенерировать и записать в буфер ЦАП frames кадров."""
+
+        return await self.run(writer.fill, generator, frames)
+
+
+class AsyncAdcStream:
+    """Асинхронный итератор по блокам данных АЦП (async for)."""
+
+    def __init__(self, adev: AsyncZET, stream: AdcStream) -> None:
+        self.adev = adev
+        self.stream = stream
+
+    def __aiter__(self) -> AsyncIterator[Block]:
+        return self
+
+    async def __anext__(self) -> Block:
+        stream = self.stream
+        while (block := await self.adev.run(stream.read)) is None:
+            # Сон в цикле событий до расчетного поступления порции драйвера
+            await asyncio.sleep(max(stream.wake_time(stream.min_frames) - time.perf_counter(), 0.0))
+        return block
+
+    async def close(self) -> None:
+        """Освободить буфер АЦП, если он был запрошен потоком."""
+
+        await self.adev.run(self.stream.close)
+
+
+__all__ = ["AsyncAdcStream", "AsyncZET"]
@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+
+"""Источники функций драйвера для IDaqZDevice."""
+
+from __future__ import annotations
+
+import os.path
+import threading
+from abc import ABC, abstractmethod
+from ctypes import CDLL, cdll
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from _ctypes import CFuncPtr, _PyCFuncPtrType
+
+
+class Backend(ABC):
+    """Источник функций драйвера.
+
+    bind(name, prototype) возвращает вызываемый объект с сигнатурой
+    функции Zadc.dll: он получает номер устройства, номер DSP и аргументы
+    ctypes согласно prototype и возвращает код завершения (0 - успех).
+
+    list_end - код, которым функции ZGetList* сообщают об индексе за
+    концом списка; None - код не известен, и конец списка означает любой
+    ненулевой код.
+    """
+
+    list_end: int | None = None
+
+    @abstractmethod
+    def bind(self, name: str, prototype: _PyCFuncPtrType) -> Callable[..., int]:
+        """Функция драйвера name с прототипом prototype."""
+
+
+class DllBackend(Backend):
+    """Функции библиотеки Zadc.dll.
+
+    Библиотека загружается при первом обращении к ее функциям (обычно
+    ZOpen), а не при импорте модуля; каждая функция связывается один раз.
+    """
+
+    def __init__(self, path: str = os.path.join(os.path.dirname(__file__), "libs", "Zadc.dll")) -> None:
+        self.path = path
+        self._lib: CDLL | None = None
+        self._bound: dict[str, CFuncPtr] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def lib(self) -> CDLL:
+        """Загруженная библиотека драйвера."""
+
+        if self._lib is None:
+            with self._lock:
+                if self._lib is None:
+                    self._lib = cdll.LoadLibrary(self.path)
+        return self._lib
+
+    def bind(self, name: str, prototype: _PyCFuncPtrType) -> CFuncPtr:
+        if (func := self._bound.get(name)) is None:
+            func = self._bound[name] = prototype((name, self.lib))
+        return func
+
+
+_backend: Backend = DllBackend()
+
+
+def get_backend() -> Backend:
+    """Источник функций драйвера для новых устройств."""
+
+    return _backend
+
+
+def set_backend(backend: Backend) -> None:
+    """Задать источник функций драйвера для новых устройств (ZET, IDaqZDevice)."""
+
+    global _backend
+    _backend = backend
+
+
+__all__ = ["Backend", "DllBackend", "get_backend", "set_backend"]
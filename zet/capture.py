@@ -0,0 +1,353 @@
+#! /usr/bin/env python3
+
+"""Запись данных АЦП в файл и чтение записанных файлов.
+
+Формат файла: заголовок HEADER (сигнатура, версия, размер заголовка,
+тип устройства, DSP, серийный номер, разрядность в словах, количество
+каналов, частота дискретизации, время начала записи), за ним CHANNEL для
+каждого включенного канала (номер, вес младшего разряда, коэффициенты
+усиления и предусиления), выравнивание до ALIGN байт и далее кадры
+перемеженных по каналам отсчетов int16/int32 с постоянным шагом.
+Количество кадров определяется размером файла.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, BinaryIO
+
+import numpy as np
+
+from zet.client import ZetError
+
+if TYPE_CHECKING:
+    from zet.stream import AdcStream, Block
+
+MAGIC = b"ZETCAP\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIIIHHdd")
+CHANNEL = struct.Struct("<Iddd")
+ALIGN = 64
+
+
+class CaptureHeader:
+    """Параметры записи, хранящиеся в заголовке файла."""
+
+    __slots__ = ("amplify", "channels", "device", "dsp", "freq", "preamplify",
+                 "resolution", "serial", "start_time", "words")
+
+    def __init__(self, device: int, dsp: int, serial: int, words: int, freq: float,
+                       channels: tuple[int, ...], resolution: tuple[float, ...],
+                       amplify: tuple[float, ...], preamplify: tuple[float, ...],
+                       start_time: float = 0.0) -> None:
+        self.device = device
+        self.dsp = dsp
+        self.serial = serial
+        self.words = words              # 16-разрядных слов на отсчет
+        self.freq = freq                # частота дискретизации (кадров в секунду)
+        self.channels = channels        # номера записанных каналов
+        self.resolution = resolution    # вес младшего разряда по каналам, В
+        self.amplify = amplify
+        self.preamplify = preamplify
+        self.start_time = start_time    # время начала записи (time.time)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(np.int16 if self.words == 1 else np.int32)
+
+    @property
+    def stride(self) -> int:
+        """Размер кадра в байтах."""
+
+        return len(self.channels) * self.dtype.itemsize
+
+    @property
+    def size(self) -> int:
+        """Размер заголовка с выравниванием, байт."""
+
+        size = HEADER.size + CHANNEL.size * len(self.channels)
+        return -(-size // ALIGN) * ALIGN
+
+    def pack(self) -> bytes:
+        header = HEADER.pack(MAGIC, VERSION, self.size, self.device, self.dsp, self.serial,
+                             self.words, len(self.channels), self.freq, self.start_time)
+        header += b"".join(CHANNEL.pack(*channel) for channel in
+                           zip(self.channels, self.resolution, self.amplify, self.preamplify))
+        return header.ljust(self.size, b"\x00")
+
+    @classmethod
+    def unpack(cls, data: bytes) -> CaptureHeader:
+        (magic, version, size, device, dsp, serial, words, nchannels,
+         freq, start_time) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            msg = f"unsupported capture format {magic!r} version {version}"
+            raise ZetError(msg)
+
+        channels = [CHANNEL.unpack_from(data, HEADER.size + CHANNEL.size * number)
+                    for number in range(nchannels)]
+        numbers, resolution, amplify, preamplify = zip(*channels) if channels else ((),) * 4
+        return cls(device, dsp, serial, words, freq, tuple(numbers), tuple(resolution),
+                   tuple(amplify), tuple(preamplify), start_time)
+
+    @classmethod
+    def from_stream(cls, stream: AdcStream) -> CaptureHeader:
+        """Заголовок для записи данных потока АЦП."""
+
+        zdev = stream.zdev
+        info = zdev.get_info()
+        return cls(zdev.device, zdev.dsp, zdev.ZGetSerialNumberDSP(), stream.words, info.freq_adc,
+                   stream.channels,
+                   tuple(info.resolution[channel] for channel in stream.channels),
+                   tuple(info.amplify[channel] for channel in stream.channels),
+                   tuple(info.preamplify[channel] for channel in stream.channels),
+                   time.time())
+
+
+_writev = getattr(os, "writev", None)
+IOV_MAX = 512       # буферов за один вызов writev
+
+
+class Recorder:
+    """Запись блоков потока АЦП в файл с фоновым выводом на диск.
+
+    write(block) копирует кадры блока из буфера драйвера в текущий
+    промежуточный буфер на chunk кадров; заполненные буферы записываются
+    на диск фоновым потоком (одним вызовом os.writev для всех накопленных
+    буферов) и возвращаются для повторного использования. Если диск не
+    успевает и свободных буферов нет, выделяется новый, так что поток
+    сбора данных не ожидает записи (счетчик spills).
+    """
+
+    def __init__(self, stream: AdcStream, path: str | os.PathLike[str], chunk: int | None = None,
+                       buffers: int = 2) -> None:
+        self.stream = stream
+        self.path = path
+        self.header = CaptureHeader.from_stream(stream)
+        self.chunk = chunk or max(int(self.header.freq // 10), 1)     # ~0,1 с данных
+
+        self.frames = 0             # передано на запись кадров
+        self.lost = 0               # потеряно кадров при переполнениях потока
+        self.spills = 0             # выделено дополнительных буферов
+        self.error: Exception | None = None
+
+        shape = (self.chunk, len(self.header.channels))
+        self._free: queue.SimpleQueue[np.ndarray] = queue.SimpleQueue()
+        for _ in range(max(buffers, 1) - 1):
+            self._free.put(np.empty(shape, self.header.dtype))
+        self._full: queue.SimpleQueue[tuple[np.ndarray, int] | None] = queue.SimpleQueue()
+        self._buffer = np.empty(shape, self.header.dtype)
+        self._fill = 0
+
+        self._file: BinaryIO = open(path, "wb")     # noqa: SIM115
+        self._file.write(self.header.pack())
+        self._file.flush()
+        self._thread = threading.Thread(target=self._run, name="Recorder", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.close()
+
+    def write(self, block: Block) -> int:
+        """Передать на запись кадры блока; возвращает их количество."""
+
+        if self.error is not None:
+            raise self.error
+
+        self.lost += block.lost
+        for part in block.parts:
+            done = 0
+            while done < len(part):
+                count = min(len(part) - done, self.chunk - self._fill)
+                self._buffer[self._fill:self._fill + count] = part[done:done + count]
+                self._fill += count
+                done += count
+                if self._fill == self.chunk:
+                    self._submit()
+
+        self.frames += len(block)
+        return len(block)
+
+    def record(self, duration: float) -> int:
+        """Записывать данные потока в течение duration секунд."""
+
+        stream = self.stream
+        frames = 0
+        deadline = time.perf_counter() + duration
+        while (now := time.perf_counter()) < deadline:
+            if (block := stream.read()) is not None:
+                frames += self.write(block)
+            else:
+                stream.wait_for_samples(stream.min_frames, timeout=deadline - now)
+        return frames
+
+    def flush(self) -> None:
+        """Передать на запись неполный промежуточный буфер."""
+
+        if self._fill:
+            self._submit()
+
+    def close(self) -> None:
+        """Дописать данные, остановить поток записи и закрыть файл."""
+
+        if self._file.closed:
+            return
+
+        self.flush()
+        self._full.put(None)
+        self._thread.join()
+        self._file.close()
+
+        if (error := self.error) is not None:
+            self.error = None
+            raise error
+
+    def _submit(self) -> None:
+        self._full.put((self._buffer, self._fill))
+        try:
+            self._buffer = self._free.get_nowait()
+        except queue.Empty:
+            self._buffer = np.empty_like(self._buffer)
+            self.spills += 1
+        self._fill = 0
+
+    def _run(self) -> None:
+        fd = self._file.fileno()
+        stop = False
+
+        while not stop:
+            pending: list[tuple[np.ndarray, int]] = []
+            while True:
+                if (item := self._full.get()) is None:
+                    stop = True
+                    break
+                pending.append(item)
+                if self._full.empty():
+                    break
+
+            if self.error is not None or not pending:
+                continue
+
+            try:
+                views = [buffer[:count].data.cast("B") for buffer, count in pending]
+                self._write(fd, views)
+            except OSError as error:
+                self.error = error
+
+            for buffer, _ in pending:
+                self._free.put(buffer)
+
+    @staticmethod
+    def _write(fd: int, views: list[memoryview]) -> None:
+        """Записать буферы целиком, повторяя вызов при неполной записи."""
+
+        while views:
+            written = _writev(fd, views[:IOV_MAX]) if _writev is not None else os.write(fd, views[0])
+            while views and written >= len(views[0]):
+                written -= len(views.pop(0))
+            if views and written:
+                views[0] = views[0][written:]
+
+
+class CaptureReader:
+    """Чтение записанного файла через отображение в память (mmap).
+
+    Данные не загружаются в ОЗУ целиком: raw - массив формы (кадры, каналы),
+    отображенный на файл, channel(number) - его столбец без копирования.
+    volts(...) переводит в вольты только запрошенный интервал времени.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = path
+        with open(path, "rb") as file:
+            data = file.read(HEADER.size)
+            if len(data) < HEADER.size:
+                msg = f"{path}: not a capture file"
+                raise ZetError(msg)
+            data += file.read(HEADER.unpack(data)[2] - HEADER.size)
+            self.header = CaptureHeader.unpack(data)
+            self._mmap: mmap.mmap | None = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = self.header
+        self.frames = (len(self._mmap) - header.size) // header.stride if header.stride else 0
+        self.raw = self._map()
+        self.scale = np.array(header.resolution) / (np.array(header.amplify) *
+                                                    np.array(header.preamplify))
+
+    def __enter__(self) -> CaptureReader:
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.frames
+
+    @property
+    def duration(self) -> float:
+        """Длительность записи, с."""
+
+        return self.frames / self.header.freq
+
+    def close(self) -> None:
+        """Закрыть отображение файла; полученные ранее представления
+        должны быть удалены до вызова.
+        """
+
+        if self._mmap is None:
+            return
+
+        self.raw = self.raw[:0].copy()
+        try:
+            self._mmap.close()
+        except BufferError:
+            self.raw = self._map()
+            msg = f"{self.path}: capture is still referenced by views"
+            raise ZetError(msg) from None
+        self._mmap = None
+
+    def _map(self) -> np.ndarray:
+        if self._mmap is None:
+            msg = f"{self.path}: capture is closed"
+            raise ZetError(msg)
+        nchannels = len(self.header.channels)
+        return np.frombuffer(self._mmap, self.header.dtype, self.frames * nchannels,
+                             self.header.size).reshape(self.frames, nchannels)
+
+    def index(self, time: float) -> int:
+        """Номер кадра для времени time от начала записи (с), в пределах записи."""
+
+        return min(max(int(round(time * self.header.freq)), 0), self.frames)
+
+    def span(self, start: float = 0.0, stop: float | None = None) -> slice:
+        """Интервал кадров для интервала времени [start, stop) от начала записи."""
+
+        return slice(self.index(start), self.frames if stop is None else self.index(stop))
+
+    def channel(self, number: int, start: float = 0.0, stop: float | None = None) -> np.ndarray:
+        """Коды канала с порядковым номером number без копирования."""
+
+        return self.raw[self.span(start, stop), number]
+
+    def volts(self, number: int | None = None, start: float = 0.0,
+                    stop: float | None = None) -> np.ndarray:
+        """Значения в вольтах за интервал времени [start, stop).
+
+        Для number=None возвращается массив формы (кадры, каналы), иначе -
+        значения канала с порядковым номером number.
+        """
+
+        raw = self.raw[self.span(start, stop)]
+        if number is None:
+            return raw * self.scale
+        return raw[:, number] * self.scale[number]
+
+
+__all__ = ["CaptureHeader", "CaptureReader", "Recorder"]
@@ -4,20 +4,34 @@
 
 from __future__ import annotations
 
-import contextlib
-import itertools
-import os.path
-from ctypes import (POINTER, WINFUNCTYPE, _Pointer, byref, c_char, c_char_p,
-                    c_double, c_long, c_ulong, c_void_p, cdll, pointer, sizeof)
+import threading
+from ctypes import (POINTER, _Pointer, addressof, byref, c_char, c_char_p,
+                    c_double, c_int16, c_int32, c_long, c_ulong, c_void_p,
+                    pointer, sizeof)
 from enum import IntEnum
-from functools import partial
-from typing import TYPE_CHECKING, Callable
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+import numpy as np
+
+from zet.backend import Backend, get_backend
+
+try:
+    from ctypes import WINFUNCTYPE
+except ImportError:     # не Windows: прототипы нужны только для описания функций
+    from ctypes import CFUNCTYPE as WINFUNCTYPE
 
 if TYPE_CHECKING:
-    from _ctypes import _CData, _PyCFuncPtrType
+    from _ctypes import _CArgObject, _CData
+
+    from zet.metrics import Metrics
 
 
-_lib = cdll.LoadLibrary(os.path.join(os.path.dirname(__file__), "libs", "Zadc.dll"))
+T = TypeVar("T")
+
+# Списки допустимых значений по (источник функций, устройство, DSP) - общие
+# для всех объектов ZET устройства и сбрасываемые любым из них
+_lists: dict[tuple[Backend, int, int], dict[str, tuple[float, ...]]] = {}
 
 
 class ZetError(Exception):
@@ -52,10 +66,13 @@ class Z_DEVICE(IntEnum):
 class IDaqZDevice(c_void_p):
     """Основной интерфейс для работы с устройствами."""
 
-    def __init__(self, device: int, dsp: int) -> None:
+    def __init__(self, device: int, dsp: int, lock: threading.RLock | None = None,
+                       backend: Backend | None = None) -> None:
         self.device = device
         self.dsp = dsp
-        self.name = ""
+        self.lock = lock
+        self.backend = backend or get_backend()
+        self.metrics: Metrics | None = None
 
     _functions_ = {
         "ZOpen": WINFUNCTYPE(c_long, c_long, c_long),
@@ -196,25 +213,212 @@ class IDaqZDevice(c_void_p):
         "ZRegulatorPWM": WINFUNCTYPE(c_long, c_long, c_long, c_void_p, POINTER(c_long)),
     }
 
-    def __call__(self, prototype: _PyCFuncPtrType, *arguments: tuple[_CData, ...]) -> bool:
-        if ret := prototype((self.name, _lib))(self.device, self.dsp, *arguments):
-            msg = f"{self.name} error {ret:04X}"
-            raise ZetError(msg)
+    def _bind(self, name: str) -> Callable[..., int]:
+        """Получить функцию драйвера по имени у источника функций."""
+
+        return self.backend.bind(name, self._functions_[name])
+
+    def __call__(self, name: str, *arguments: _CData | _CArgObject) -> bool:
+        return getattr(self, name)(*arguments)
 
-        return True
+    def status(self, name: str, *arguments: _CData | _CArgObject) -> int:
+        """Вызвать функцию библиотеки и вернуть код завершения без проверки."""
+
+        if self.lock is None:
+            return self._bind(name)(self.device, self.dsp, *arguments)
+
+        with self.lock:
+            return self._bind(name)(self.device, self.dsp, *arguments)
+
+    def instrument(self, metrics: Metrics | None) -> None:
+        """Вкл. (metrics) или выкл. (None) учета вызовов функций драйвера.
+
+        Созданные ранее методы удаляются и при следующем обращении
+        создаются заново, поэтому при выключенном учете вызовы не требуют
+        дополнительных действий.
+        """
+
+        self.metrics = metrics
+        for name in self._functions_:
+            self.__dict__.pop(name, None)
 
     def __getattr__(self, name: str) -> Callable[..., bool]:    # type: ignore
-        self.name = name
-        return partial(self.__call__, self._functions_[name])
+        func = self._bind(name)
+        if self.metrics is not None:
+            func = self.metrics.timed(name, func)
+        device, dsp, lock = self.device, self.dsp, self.lock
+
+        if lock is None:
+            def method(*arguments: _CData) -> bool:
+                if ret := func(device, dsp, *arguments):
+                    msg = f"{name} error {ret:04X}"
+                    raise ZetError(msg)
+
+                return True
+        else:
+            def method(*arguments: _CData) -> bool:
+                with lock:
+                    ret = func(device, dsp, *arguments)
+                if ret:
+                    msg = f"{name} error {ret:04X}"
+                    raise ZetError(msg)
+
+                return True
+
+        # Последующие обращения находят метод в __dict__ и минуют __getattr__
+        setattr(self, name, method)
+        return method
+
+
+class RingBuffer:
+    """Кольцевой буфер в ОЗУ ПК, выделенный драйвером (ZGetBufferADC/DAC).
+
+    Размер буфера и указатели драйвера измеряются в 16-разрядных словах,
+    каждый отсчет занимает words слов, поэтому массив содержит
+    size // words отсчетов типа int16 (words=1) или int32 (words=2).
+
+    После освобождения драйвером (ZRemBufferADC/DAC) буфер помечается
+    released: array возбуждает ZetError, а потоки, сохранившие массив
+    буфера (AdcStream, DacWriter), проверяют released перед каждым
+    обращением к памяти. Полученные ранее представления (например,
+    Block.parts) после освобождения использовать нельзя.
+    """
+
+    __slots__ = ("_array", "ptr", "size", "words")
+
+    def __init__(self, ptr: _Pointer[c_long], size: int, words: int,
+                       readonly: bool = True) -> None:
+        self.ptr = ptr
+        self.size = size
+        self.words = words
+
+        ctype = c_int16 if words == 1 else c_int32
+        memory = (ctype * (size // words)).from_address(addressof(ptr.contents))
+
+        self._array: np.ndarray | None = np.ctypeslib.as_array(memory)
+        self._array.flags.writeable = not readonly
+
+    def __len__(self) -> int:
+        return self.size // self.words
+
+    @property
+    def released(self) -> bool:
+        """Буфер освобожден и больше не доступен."""
+
+        return self._array is None
+
+    @property
+    def array(self) -> np.ndarray:
+        """Массив NumPy, отображенный на память буфера драйвера."""
+
+        if self._array is None:
+            msg = "buffer has been released"
+            raise ZetError(msg)
+
+        return self._array
+
+    @property
+    def memory(self) -> memoryview:
+        """Представление буфера в виде memoryview."""
+
+        return self.array.data
+
+    def release(self) -> None:
+        """Пометить буфер освобожденным (перед его освобождением драйвером)."""
+
+        self._array = None
+
+
+def _modifies(method: Callable[..., T]) -> Callable[..., T]:
+    """Метод изменяет настройки устройства: снимок DeviceInfo и списки
+    допустимых значений (они зависят, например, от числа включенных
+    каналов) сбрасываются.
+    """
+
+    @wraps(method)
+    def wrapper(self: ZET, *args: object, **kwargs: object) -> T:
+        self._info = None
+        self._lists.clear()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class DeviceInfo:
+    """Снимок характеристик и текущих настроек устройства.
+
+    Все значения читаются из драйвера одной серией вызовов; поканальные
+    значения приводятся для всех каналов АЦП (индекс - номер канала).
+    """
+
+    __slots__ = ("amplify", "bits_adc", "bits_dac", "channels", "enable_dac", "freq_adc",
+                 "freq_dac", "interrupt_adc", "interrupt_dac", "list_amplify_adc",
+                 "list_freq_adc", "list_freq_dac", "modify", "preamplify", "quantity_adc",
+                 "quantity_dac", "resolution", "resolution_dac", "words_adc", "words_dac")
+
+    def __init__(self, zdev: ZET) -> None:
+        self.modify = zdev.ZGetModify()
+
+        self.quantity_adc = zdev.ZGetQuantityChannelADC()
+        self.words_adc = zdev.ZGetWordsADC()
+        self.bits_adc = zdev.ZGetBitsADC()
+        self.freq_adc = zdev.ZGetFreqADC()
+        self.interrupt_adc = zdev.ZGetInterruptADC()
+        self.list_freq_adc = zdev.ZGetListFreqADC()
+        self.list_amplify_adc: tuple[float, ...] = _suppress(zdev.ZGetListAmplifyADC, default=())
+
+        channels = range(self.quantity_adc)
+        self.channels = tuple(channel for channel in channels if zdev.ZGetInputADC(channel))
+        self.resolution = tuple(zdev.ZGetDigitalResolChanADC(channel) for channel in channels)
+        self.amplify = tuple(zdev.ZGetAmplifyADC(channel) for channel in channels)
+        self.preamplify = tuple(_suppress(zdev.ZGetPreAmplifyADC, channel, default=1.0)
+                                for channel in channels)
+
+        self.enable_dac = zdev.ZGetEnableDAC()
+        if self.enable_dac:
+            self.quantity_dac = zdev.ZGetQuantityChannelDAC()
+            self.words_dac = zdev.ZGetWordsDAC()
+            self.bits_dac = zdev.ZGetBitsDAC()
+            self.freq_dac = zdev.ZGetFreqDAC()
+            self.interrupt_dac = zdev.ZGetInterruptDAC()
+            self.list_freq_dac = zdev.ZGetListFreqDAC()
+            self.resolution_dac = zdev.ZGetDigitalResolutionDAC()
+        else:
+            self.quantity_dac = self.words_dac = self.bits_dac = self.interrupt_dac = 0
+            self.freq_dac = self.resolution_dac = 0.0
+            self.list_freq_dac = ()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _suppress(func: Callable[..., T], *args: object, default: T) -> T:
+    """Вызвать функцию драйвера, вернув default, если она не поддерживается."""
+
+    try:
+        return func(*args)
+    except ZetError:
+        return default
 
 
 class ZET:
     """Python wrapper for Zadc library."""
 
-    def __init__(self, device: int, dsp: int) -> None:
-        """Инициализация класса клиента с указанными параметрами."""
+    def __init__(self, device: int, dsp: int, locked: bool = False,
+                       backend: Backend | None = None) -> None:
+        """Инициализация класса клиента с указанными параметрами.
+
+        При locked=True вызовы драйвера для устройства сериализуются, что
+        нужно, если функции драйвера используются из нескольких потоков
+        и не являются реентерабельными. backend - источник функций драйвера
+        (по умолчанию Zadc.dll, см. zet.backend.set_backend).
+        """
 
-        self._zdev = IDaqZDevice(device, dsp)
+        self._zdev = IDaqZDevice(device, dsp, threading.RLock() if locked else None, backend)
+        self._buffers: dict[str, RingBuffer] = {}
+        self._info: DeviceInfo | None = None
+        self._lists = _lists.setdefault((self._zdev.backend, device, dsp), {})
 
     def __enter__(self) -> ZET:
         """Входной блок контекстного менеджера."""
@@ -227,6 +431,33 @@ class ZET:
 
         self.ZClose()
 
+    @property
+    def device(self) -> int:
+        """Тип устройства (Z_DEVICE)."""
+
+        return self._zdev.device
+
+    @property
+    def dsp(self) -> int:
+        """Номер сигнального процессора."""
+
+        return self._zdev.dsp
+
+    @property
+    def metrics(self) -> Metrics | None:
+        """Показатели, в которых учитываются вызовы драйвера (см. instrument)."""
+
+        return self._zdev.metrics
+
+    def instrument(self, metrics: Metrics | None) -> None:
+        """Вкл./выкл. учета времени вызовов функций драйвера в metrics.
+
+        Потоки данных, создаваемые после включения, учитывают в тех же
+        показателях отставание чтения, переполнения и опустошения буферов.
+        """
+
+        self._zdev.instrument(metrics)
+
 # Подключение к драйверу и отключение
 
     def ZOpen(self) -> bool:
@@ -241,11 +472,13 @@ class ZET:
 
 # Сброс и инициализация
 
+    @_modifies
     def ZInitDSP(self, filename: str = "") -> bool:
         """Проинициализировать сигнальный процессор."""
 
         return self._zdev.ZInitDSP(filename.encode("ascii"))
 
+    @_modifies
     def ZResetDSP(self) -> bool:
         """Сброс и останов сигнальных процессоров (влияет на все DSP одного
         устройства).
@@ -283,13 +516,28 @@ class ZET:
         self._zdev.ZGetModify(byref(modify))
         return modify.value
 
+    def get_info(self, check: bool = False) -> DeviceInfo:
+        """Снимок характеристик и настроек устройства.
+
+        Снимок кэшируется и сбрасывается методами, меняющими настройки.
+        При check=True дополнительно сравнивается счетчик изменений
+        параметров ZGetModify (например, изменений из другой программы).
+        """
+
+        if self._info is None or (check and self._info.modify != self.ZGetModify()):
+            self._lists.clear()
+            self._info = DeviceInfo(self)
+        return self._info
+
 # Установка режима работы сигнального процессора
 
+    @_modifies
     def ZSetTypeADC(self) -> bool:
         """Установить сигнальный процессор в режим АЦП."""
 
         return self._zdev.ZSetTypeADC()
 
+    @_modifies
     def ZSetTypeDAC(self) -> bool:
         """Установить сигнальный процессор в режим ЦАП."""
 
@@ -398,29 +646,14 @@ class ZET:
     def ZGetListFreqADC(self) -> tuple[float, ...]:
         """Получение списка возможных частот дискретизации АЦП."""
 
-        freq = c_double()
-        freq_list = []
-
-        with contextlib.suppress(Exception):
-            for i in itertools.count():
-                self._zdev.ZGetListFreqADC(c_long(i), byref(freq))
-                freq_list.append(freq.value)
-
-        return tuple(freq_list)
+        return self._get_list("ZGetListFreqADC")
 
     def ZGetListFreqDAC(self) -> tuple[float, ...]:
         """Получение списка возможных частот дискретизации ЦАП."""
 
-        freq = c_double()
-        freq_list = []
-
-        with contextlib.suppress(Exception):
-            for i in itertools.count():
-                self._zdev.ZGetListFreqDAC(c_long(i), byref(freq))
-                freq_list.append(freq.value)
-
-        return tuple(freq_list)
+        return self._get_list("ZGetListFreqDAC")
 
+    @_modifies
     def ZSetNextFreqADC(self, next: int) -> float:
         """Установить следующую из списка частоту дискретизации АЦП."""
 
@@ -429,6 +662,7 @@ class ZET:
         self._zdev.ZSetNextFreqADC(c_long(next), byref(freq))
         return freq.value
 
+    @_modifies
     def ZSetNextFreqDAC(self, next: int) -> float:
         """Установить следующую из списка частоту дискретизации ЦАП."""
 
@@ -453,6 +687,7 @@ class ZET:
         self._zdev.ZGetFreqDAC(byref(freq))
         return freq.value
 
+    @_modifies
     def ZSetFreqADC(self, freq: float) -> float:
         """Установка частоты дискретизации АЦП."""
 
@@ -461,6 +696,7 @@ class ZET:
         self._zdev.ZSetFreqADC(c_double(freq), byref(freq_out))
         return freq_out.value
 
+    @_modifies
     def ZSetFreqDAC(self, freq: float) -> float:
         """Установка частоты дискретизации ЦАП."""
 
@@ -485,11 +721,13 @@ class ZET:
         self._zdev.ZGetExtFreqDAC(byref(freq))
         return freq.value
 
+    @_modifies
     def ZSetExtFreqADC(self, freq: float) -> bool:
         """Установка значения внешней опорной частоты АЦП."""
 
         return self._zdev.ZSetExtFreqADC(c_double(freq))
 
+    @_modifies
     def ZSetExtFreqDAC(self, freq: float) -> bool:
         """Установка значения внешней опорной частоты ЦАП."""
 
@@ -503,6 +741,7 @@ class ZET:
         self._zdev.ZGetEnableExtFreq(byref(enable))
         return enable.value
 
+    @_modifies
     def ZSetEnableExtFreq(self, enable: int) -> bool:
         """Вкл./выкл. синхронизации по внешней частоте (устаревшая функция)."""
 
@@ -555,11 +794,13 @@ class ZET:
         self._zdev.ZGetOutputDAC(c_long(channel), byref(enable))
         return enable.value
 
+    @_modifies
     def ZSetInputADC(self, channel: int, enable: int) -> bool:
         """Включить/выключить заданный канал АЦП."""
 
         return self._zdev.ZSetInputADC(c_long(channel), c_long(enable))
 
+    @_modifies
     def ZSetOutputDAC(self, channel: int, enable: int) -> bool:
         """Включить/выключить заданный канал ЦАП."""
 
@@ -573,6 +814,7 @@ class ZET:
         self._zdev.ZGetInputDiffADC(c_long(channel), byref(enable))
         return enable.value
 
+    @_modifies
     def ZSetInputDiffADC(self, channel: int, enable: int) -> bool:
         """Установить-сбросить заданный канал для ввода в дифференциальный
         режим АЦП.
@@ -585,16 +827,9 @@ class ZET:
     def ZGetListAmplifyADC(self) -> tuple[float, ...]:
         """Получение списка возможных коэффициентов усиления АЦП."""
 
-        amplify = c_double()
-        amplify_list = []
-
-        with contextlib.suppress(Exception):
-            for i in itertools.count():
-                self._zdev.ZGetListAmplifyADC(c_long(i), byref(amplify))
-                amplify_list.append(amplify.value)
-
-        return tuple(amplify_list)
+        return self._get_list("ZGetListAmplifyADC")
 
+    @_modifies
     def ZSetNextAmplifyADC(self, channel: int, next: int) -> float:
         """Установка большего или меньшего коэффициента усиления из списка
         выбранного канала АЦП.
@@ -613,6 +848,7 @@ class ZET:
         self._zdev.ZGetAmplifyADC(c_long(channel), byref(amplify))
         return amplify.value
 
+    @_modifies
     def ZSetAmplifyADC(self, channel: int, amplify: float) -> float:
         """Установка коэффициента усиления выбранного канала АЦП."""
 
@@ -628,16 +864,9 @@ class ZET:
         усилителя.
         """
 
-        amplify = c_double()
-        amplify_list = []
-
-        with contextlib.suppress(Exception):
-            for i in itertools.count():
-                self._zdev.ZGetListPreAmplifyADC(c_long(i), byref(amplify))
-                amplify_list.append(amplify.value)
-
-        return tuple(amplify_list)
+        return self._get_list("ZGetListPreAmplifyADC")
 
+    @_modifies
     def ZSetNextPreAmplifyADC(self, channel: int, next: int) -> float:
         """Установка большего или меньшего коэффициента усиления из списка
         предварительного усилителя.
@@ -648,6 +877,7 @@ class ZET:
         self._zdev.ZSetNextPreAmplifyADC(c_long(channel), c_long(next), byref(amplify))
         return amplify.value
 
+    @_modifies
     def ZSetPreAmplifyADC(self, channel: int, amplify: float) -> float:
         """Установка коэффициента усиления предварительного усилителя выбранного
         канала.
@@ -678,6 +908,7 @@ class ZET:
         self._zdev.ZGetAttenDAC(c_long(channel), byref(reduction))
         return reduction.value
 
+    @_modifies
     def ZSetAttenDAC(self, channel: int, reduction: float) -> float:
         """Установка коэффициента ослабления аттенюатора выбранного канала."""
 
@@ -727,11 +958,13 @@ class ZET:
         self._zdev.ZGetMaxInterruptDAC(byref(size))
         return size.value
 
+    @_modifies
     def ZSetInterruptADC(self, size: int) -> bool:
         """Установка размера буфера для перекачки данных АЦП."""
 
         return self._zdev.ZSetInterruptADC(c_long(size))
 
+    @_modifies
     def ZSetInterruptDAC(self, size: int) -> bool:
         """Установка размера буфера для перекачки данных ЦАП."""
 
@@ -765,15 +998,53 @@ class ZET:
         self._zdev.ZGetBufferDAC(byref(buff_ptr), byref(size))
         return buff_ptr, size.value
 
-    def ZRemBufferADC(self, buff_ptr: _Pointer[c_long]) -> bool:
+    def ZRemBufferADC(self, buff_ptr: _Pointer[c_long] | RingBuffer) -> bool:
         """Освободить буфер в ОЗУ ПК для АЦП."""
 
-        return self._zdev.ZRemBufferADC(byref(buff_ptr))
+        return self._zdev.ZRemBufferADC(byref(self._release_buffer("ADC", buff_ptr)))
 
-    def ZRemBufferDAC(self, buff_ptr: _Pointer[c_long]) -> bool:
+    def ZRemBufferDAC(self, buff_ptr: _Pointer[c_long] | RingBuffer) -> bool:
         """Освободить буфер в ОЗУ ПК для ЦАП."""
 
-        return self._zdev.ZRemBufferDAC(byref(buff_ptr))
+        return self._zdev.ZRemBufferDAC(byref(self._release_buffer("DAC", buff_ptr)))
+
+    def get_buffer_adc(self) -> RingBuffer:
+        """Запросить буфер в ОЗУ ПК для АЦП в виде массива без копирования.
+
+        Уже запрошенный и не освобожденный буфер возвращается повторно
+        (для буфера другого размера его нужно освободить ZRemBufferADC).
+        """
+
+        if (buff := self._buffers.get("ADC")) is None or buff.released:
+            buff_ptr, size = self.ZGetBufferADC()
+            buff = self._buffers["ADC"] = RingBuffer(buff_ptr, size, self.ZGetWordsADC())
+        return buff
+
+    def get_buffer_dac(self) -> RingBuffer:
+        """Запросить буфер в ОЗУ ПК для ЦАП в виде массива без копирования.
+
+        Уже запрошенный и не освобожденный буфер возвращается повторно
+        (для буфера другого размера его нужно освободить ZRemBufferDAC).
+        """
+
+        if (buff := self._buffers.get("DAC")) is None or buff.released:
+            buff_ptr, size = self.ZGetBufferDAC()
+            buff = self._buffers["DAC"] = RingBuffer(buff_ptr, size, self.ZGetWordsDAC(),
+                                                     readonly=False)
+        return buff
+
+    def _release_buffer(self, kind: str, buff_ptr: _Pointer[c_long] | RingBuffer) -> _Pointer[c_long]:
+        """Пометить буфер освобожденным перед его освобождением драйвером."""
+
+        if (buff := self._buffers.get(kind)) is not None:
+            buff.release()
+            del self._buffers[kind]
+
+        if isinstance(buff_ptr, RingBuffer):
+            buff_ptr.release()
+            buff_ptr = buff_ptr.ptr
+
+        return buff_ptr
 
     def ZSetCycleSampleADC(self, enable: int) -> bool:
         """Установка циклического или одноразового накопления АЦП."""
@@ -871,6 +1142,7 @@ class ZET:
         self._zdev.ZGetHCPADC(c_long(channel), byref(enable))
         return enable.value
 
+    @_modifies
     def ZSetHCPADC(self, channel: int, enable: int) -> bool:
         """Установка режима работы заданного канала модуля HCP."""
 
@@ -996,11 +1268,13 @@ class ZET:
         self._zdev.ZGetEnableExtFreqDAC(byref(enable))
         return enable.value
 
+    @_modifies
     def ZSetEnableExtFreqADC(self, enable: int) -> bool:
         """Вкл./выкл. синхронизации по внешней частоте АЦП."""
 
         return self._zdev.ZSetEnableExtFreqADC(c_long(enable))
 
+    @_modifies
     def ZSetEnableExtFreqDAC(self, enable: int) -> bool:
         """Вкл./выкл. синхронизации по внешней частоте ЦАП."""
 
@@ -1214,5 +1488,70 @@ class ZET:
         return self._zdev.ZTestCode(byref(c_long(code0)), byref(c_long(code1)),
                                     byref(c_long(code2)))
 
+# Списки допустимых значений
+
+    def nearest_freq_adc(self, freq: float | np.ndarray) -> float | np.ndarray:
+        """Ближайшие к заданным поддерживаемые частоты дискретизации АЦП."""
+
+        return self._nearest("ZGetListFreqADC", freq)
+
+    def nearest_freq_dac(self, freq: float | np.ndarray) -> float | np.ndarray:
+        """Ближайшие к заданным поддерживаемые частоты дискретизации ЦАП."""
+
+        return self._nearest("ZGetListFreqDAC", freq)
+
+    def nearest_amplify_adc(self, amplify: float | np.ndarray) -> float | np.ndarray:
+        """Ближайшие к заданным поддерживаемые коэффициенты усиления АЦП."""
+
+        return self._nearest("ZGetListAmplifyADC", amplify)
+
+    def nearest_preamplify_adc(self, amplify: float | np.ndarray) -> float | np.ndarray:
+        """Ближайшие к заданным поддерживаемые коэффициенты усиления
+        предварительного усилителя.
+        """
+
+        return self._nearest("ZGetListPreAmplifyADC", amplify)
+
+    def _get_list(self, name: str) -> tuple[float, ...]:
+        """Прочитать список значений, перебирая индексы до отказа драйвера.
+
+        Конец списка определяется по коду завершения без возбуждения
+        исключений: по коду list_end источника функций драйвера (другие
+        коды означают настоящую ошибку) или, если он не известен, по
+        любому ненулевому коду. Списки кэшируются для устройства на время
+        работы процесса и сбрасываются при изменении настроек (см.
+        _modifies) или обнаружении внешних изменений get_info(check=True).
+        """
+
+        if (values := self._lists.get(name)) is None:
+            value = c_double()
+            items: list[float] = []
+
+            while not (ret := self._zdev.status(name, c_long(len(items)), byref(value))):
+                items.append(value.value)
+
+            end = self._zdev.backend.list_end
+            if end is not None and ret != end:
+                msg = f"{name} error {ret:04X}"
+                raise ZetError(msg)
+            values = self._lists[name] = tuple(items)
+
+        return values
+
+    def _nearest(self, name: str, values: float | np.ndarray) -> float | np.ndarray:
+        """Ближайшие к values элементы списка name (скаляр или массив)."""
+
+        table = np.unique(self._get_list(name))     # отсортированные значения
+        if not len(table):
+            msg = f"{name}: device reports no values"
+            raise ZetError(msg)
+        values = np.asarray(values, dtype=np.float64)
+
+        index = np.clip(np.searchsorted(table, values), 1, max(len(table) - 1, 1))
+        lower, upper = table[index - 1], table[np.minimum(index, len(table) - 1)]
+        nearest = np.where(values - lower <= upper - values, lower, upper)
+
+        return float(nearest) if nearest.ndim == 0 else nearest
+
 
 __all__ = ["ZET"]
@@ -0,0 +1,223 @@
+#! /usr/bin/env python3
+
+"""Декларативное описание настроек АЦП и их применение к устройству."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Tuple
+
+from zet.client import ZetError
+
+if TYPE_CHECKING:
+    from zet.client import ZET, DeviceInfo
+
+Call = Tuple[str, Tuple[Any, ...]]      # (метод ZET, аргументы)
+
+
+class ChannelConfig:
+    """Настройки канала АЦП; None - параметр не задан (не меняется)."""
+
+    __slots__ = ("amplify", "diff", "enabled", "hcp", "preamplify")
+
+    def __init__(self, enabled: bool | None = None, amplify: float | None = None,
+                       preamplify: float | None = None, diff: bool | None = None,
+                       hcp: bool | None = None) -> None:
+        self.enabled = enabled
+        self.amplify = amplify
+        self.preamplify = preamplify
+        self.diff = diff            # дифференциальный вход
+        self.hcp = hcp              # питание ICP-датчика (модуль HCP)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__
+                           if getattr(self, name) is not None)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ChannelConfig):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__
+                if getattr(self, name) is not None}
+
+
+class DeviceConfig:
+    """Настройки АЦП устройства: частота дискретизации, размер порции
+    данных (interrupt) и параметры каналов (channels - словарь номер
+    канала: ChannelConfig). Незаданные (None) и не перечисленные в
+    channels параметры не меняются.
+
+    apply() сравнивает настройки с текущими и вызывает функции драйвера
+    только для отличающихся значений в порядке, учитывающем зависимости
+    параметров: сначала выключаются, затем включаются каналы (от их числа
+    зависят допустимые частоты и размеры порций), затем режимы входов,
+    HCP и коэффициенты усиления, частота и в конце размер порции.
+    Частота и коэффициенты приводятся к ближайшим поддерживаемым значениям
+    из списков, действующих после изменения каналов, поэтому уже
+    установленные значения не переустанавливаются.
+    """
+
+    __slots__ = ("channels", "freq", "interrupt")
+
+    def __init__(self, freq: float | None = None, interrupt: int | None = None,
+                       channels: Mapping[int, ChannelConfig] | None = None) -> None:
+        self.freq = freq
+        self.interrupt = interrupt
+        self.channels: dict[int, ChannelConfig] = dict(channels or {})
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(freq={self.freq!r}, interrupt={self.interrupt!r}, " \
+               f"channels={self.channels!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DeviceConfig):
+            return NotImplemented
+        return (self.freq, self.interrupt, self.channels) == (other.freq, other.interrupt, other.channels)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> DeviceConfig:
+        """Настройки из словаря (например, прочитанного из JSON)."""
+
+        channels = {int(channel): ChannelConfig(**values)
+                    for channel, values in data.get("channels", {}).items()}
+        return cls(data.get("freq"), data.get("interrupt"), channels)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: Dict[str, Any] = {"channels": {channel: config.to_dict()
+                                             for channel, config in sorted(self.channels.items())}}
+        if self.interrupt is not None:
+            data["interrupt"] = self.interrupt
+        if self.freq is not None:
+            data["freq"] = self.freq
+        return data
+
+    @classmethod
+    def from_device(cls, zdev: ZET, diff: bool = False, hcp: bool = False) -> DeviceConfig:
+        """Текущие настройки устройства (режимы входов и HCP опрашиваются
+        только по запросу - это отдельные вызовы для каждого канала).
+        """
+
+        info = zdev.get_info()
+        channels = {channel: ChannelConfig(channel in info.channels, info.amplify[channel],
+                                           info.preamplify[channel],
+                                           bool(zdev.ZGetInputDiffADC(channel)) if diff else None,
+                                           bool(zdev.ZGetHCPADC(channel)) if hcp else None)
+                    for channel in range(info.quantity_adc)}
+        return cls(info.freq_adc, info.interrupt_adc, channels)
+
+    def plan(self, zdev: ZET) -> list[Call]:
+        """Вызовы, необходимые для перевода устройства в эти настройки
+        (в порядке выполнения), без их выполнения.
+
+        Текущие настройки читаются заново, если их изменили вне этого
+        объекта (get_info(check=True)). Частота и коэффициенты приводятся
+        к спискам, действующим до включения и выключения каналов; apply()
+        после изменения каналов планирует их заново.
+        """
+
+        info = self._snapshot(zdev)
+        return self._switches(info) + self._settings(zdev, info)
+
+    def apply(self, zdev: ZET) -> DeviceConfig:
+        """Применить настройки к устройству.
+
+        Сначала включаются и выключаются каналы, затем по новым спискам
+        допустимых значений планируются и выполняются остальные вызовы.
+        Возвращает заданные параметры в том виде, в каком их установил
+        драйвер (частота и коэффициенты усиления - значения, возвращенные
+        функциями установки).
+        """
+
+        info = self._snapshot(zdev)     # снимок до изменений
+        result = DeviceConfig(
+            None if self.freq is None else info.freq_adc,
+            None if self.interrupt is None else info.interrupt_adc,
+            {channel: ChannelConfig(None if config.enabled is None else channel in info.channels,
+                                    None if config.amplify is None else info.amplify[channel],
+                                    None if config.preamplify is None else info.preamplify[channel],
+                                    config.diff, config.hcp)
+             for channel, config in self.channels.items()})
+
+        self._call(zdev, self._switches(info), result)
+        self._call(zdev, self._settings(zdev, zdev.get_info()), result)    # снимок после изменения каналов
+        return result
+
+    def _snapshot(self, zdev: ZET) -> DeviceInfo:
+        info = zdev.get_info(check=True)
+        if unknown := [channel for channel in self.channels if not 0 <= channel < info.quantity_adc]:
+            msg = f"device has no ADC channels {unknown}"
+            raise ZetError(msg)
+        return info
+
+    def _switches(self, info: DeviceInfo) -> list[Call]:
+        """Выключение, затем включение каналов."""
+
+        disable: list[Call] = []
+        enable: list[Call] = []
+        for channel, config in sorted(self.channels.items()):
+            if config.enabled is not None and config.enabled != (channel in info.channels):
+                (enable if config.enabled else disable).append(
+                    ("ZSetInputADC", (channel, int(config.enabled))))
+        return disable + enable
+
+    def _settings(self, zdev: ZET, info: DeviceInfo) -> list[Call]:
+        """Режимы входов, HCP, коэффициенты усиления, частота и размер порции."""
+
+        items = sorted(self.channels.items())
+        calls: list[Call] = []
+        for channel, config in items:
+            if config.diff is not None and config.diff != bool(zdev.ZGetInputDiffADC(channel)):
+                calls.append(("ZSetInputDiffADC", (channel, int(config.diff))))
+
+        for channel, config in items:
+            if config.hcp is not None and config.hcp != bool(zdev.ZGetHCPADC(channel)):
+                calls.append(("ZSetHCPADC", (channel, int(config.hcp))))
+
+        for channel, config in items:
+            if config.amplify is not None:
+                amplify = _nearest(zdev.nearest_amplify_adc, config.amplify)
+                if amplify != info.amplify[channel]:
+                    calls.append(("ZSetAmplifyADC", (channel, amplify)))
+            if config.preamplify is not None:
+                preamplify = _nearest(zdev.nearest_preamplify_adc, config.preamplify)
+                if preamplify != info.preamplify[channel]:
+                    calls.append(("ZSetPreAmplifyADC", (channel, preamplify)))
+
+        if self.freq is not None:
+            freq = _nearest(zdev.nearest_freq_adc, self.freq)
+            if freq != info.freq_adc:
+                calls.append(("ZSetFreqADC", (freq,)))
+        if self.interrupt is not None and self.interrupt != info.interrupt_adc:
+            calls.append(("ZSetInterruptADC", (self.interrupt,)))
+        return calls
+
+    @staticmethod
+    def _call(zdev: ZET, calls: list[Call], result: DeviceConfig) -> None:
+        """Выполнить вызовы, запоминая в result установленные значения."""
+
+        for name, args in calls:
+            value = getattr(zdev, name)(*args)
+            if name == "ZSetInputADC":
+                result.channels[args[0]].enabled = bool(args[1])
+            elif name == "ZSetAmplifyADC":
+                result.channels[args[0]].amplify = value
+            elif name == "ZSetPreAmplifyADC":
+                result.channels[args[0]].preamplify = value
+            elif name == "ZSetFreqADC":
+                result.freq = value
+            elif name == "ZSetInterruptADC":
+                result.interrupt = zdev.ZGetInterruptADC()
+
+
+def _nearest(nearest: Any, value: float) -> float:
+    """Ближайшее поддерживаемое значение (если драйвер не отдает список - value)."""
+
+    try:
+        return nearest(value)
+    except ZetError:
+        return value
+
+
+__all__ = ["ChannelConfig", "DeviceConfig"]
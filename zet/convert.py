@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+
+"""Перевод кодов АЦП в вольты."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+if TYPE_CHECKING:
+    from zet.client import ZET
+    from zet.stream import Block
+
+Calibration = Mapping[int, Tuple[float, float]]     # канал -> (коэффициент, смещение В)
+Source = Union["Block", np.ndarray]
+
+
+class Converter:
+    """Перевод кодов АЦП в вольты по заранее вычисленным коэффициентам.
+
+    Для каждого канала volts = code * scale + offset, где
+    scale = resolution / (amplify * preamplify), умноженный на
+    коэффициент калибровки, а offset - смещение калибровки. Блок
+    переводится целиком векторными операциями в массив вызывающей стороны
+    без выделения памяти.
+    """
+
+    def __init__(self, scale: ArrayLike, offset: ArrayLike | None = None) -> None:
+        self.scale: np.ndarray = np.asarray(scale, dtype=np.float64)
+        self.offset: np.ndarray = (np.zeros_like(self.scale) if offset is None
+                                   else np.asarray(offset, np.float64))
+        self._vectors: dict[np.dtype, tuple[np.ndarray, np.ndarray]] = {
+            np.dtype(np.float64): (self.scale, self.offset),
+            np.dtype(np.float32): (self.scale.astype(np.float32), self.offset.astype(np.float32))}
+        self._has_offset = bool(self.offset.any())
+
+    def __len__(self) -> int:
+        return len(self.scale)
+
+    @classmethod
+    def from_device(cls, zdev: ZET, channels: Sequence[int] | None = None,
+                         calibration: Calibration | None = None) -> Converter:
+        """Коэффициенты для включенных (или перечисленных в channels) каналов
+        по текущим настройкам устройства.
+        """
+
+        info = zdev.get_info()
+        channels = info.channels if channels is None else channels
+        calibration = calibration or {}
+
+        gain = np.array([calibration.get(channel, (1.0, 0.0))[0] for channel in channels])
+        offset = np.array([calibration.get(channel, (1.0, 0.0))[1] for channel in channels])
+        scale = gain * np.array([info.resolution[channel] /
+                                 (info.amplify[channel] * info.preamplify[channel])
+                                 for channel in channels])
+        return cls(scale, offset)
+
+    def convert(self, source: Source, out: np.ndarray | None = None,
+                      dtype: np.dtype | type = np.float64) -> np.ndarray:
+        """Перевести кадры формы (кадры, каналы) в массив out той же формы.
+
+        source - Block или массив кодов; при out=None массив выделяется.
+        """
+
+        parts = _parts(source)
+        frames = sum(len(part) for part in parts)
+        if out is None:
+            out = np.empty((frames, len(self)), dtype)
+        scale, offset = self._vectors[out.dtype]
+
+        start = 0
+        for part in parts:
+            stop = start + len(part)
+            np.multiply(part, scale, out=out[start:stop], casting="unsafe")
+            if self._has_offset:
+                np.add(out[start:stop], offset, out=out[start:stop])
+            start = stop
+
+        return out
+
+    def deinterleave(self, source: Source, out: np.ndarray | None = None,
+                           dtype: np.dtype | type = np.float64) -> np.ndarray:
+        """Разделить кадры по каналам и перевести в вольты за один проход.
+
+        Результат имеет форму (каналы, кадры): строка n - непрерывный
+        массив значений канала n.
+        """
+
+        parts = _parts(source)
+        frames = sum(len(part) for part in parts)
+        if out is None:
+            out = np.empty((len(self), frames), dtype)
+        scale, offset = self._vectors[out.dtype]
+
+        start = 0
+        for part in parts:
+            stop = start + len(part)
+            for number in range(len(self)):
+                row = out[number, start:stop]
+                np.multiply(part[:, number], scale[number], out=row, casting="unsafe")
+                if self._has_offset:
+                    np.add(row, offset[number], out=row)
+            start = stop
+
+        return out
+
+
+def _parts(source: Source) -> tuple[np.ndarray, ...]:
+    """Массивы кадров блока или массива кодов."""
+
+    parts = getattr(source, "parts", None)
+    return parts if parts is not None else (np.asarray(source),)
+
+
+__all__ = ["Converter"]
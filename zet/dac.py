@@ -0,0 +1,353 @@
+#! /usr/bin/env python3
+
+"""Блочная запись сигналов в кольцевой буфер ЦАП."""
+
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from math import pi
+from typing import TYPE_CHECKING, Callable, Sequence, Union
+
+import numpy as np
+
+from zet.client import ZetError
+from zet.stream import RingPointer
+
+if TYPE_CHECKING:
+    from zet.client import ZET, RingBuffer
+
+
+class Waveform(ABC):
+    """Генератор сигнала, фаза которого непрерывна между блоками.
+
+    Вызов generator(n, rate) возвращает n очередных значений сигнала
+    (в вольтах) для частоты дискретизации rate. Любой вызываемый объект
+    с такой сигнатурой может использоваться вместо Waveform.
+    """
+
+    def __init__(self, freq: float, amplitude: float = 1.0, offset: float = 0.0,
+                       phase: float = 0.0) -> None:
+        self.freq = freq
+        self.amplitude = amplitude
+        self.offset = offset
+        self.phase = phase          # текущая фаза в долях периода
+
+    def __call__(self, n: int, rate: float) -> np.ndarray:
+        return self.offset + self.amplitude * self.shape(self._advance(n, self.freq / rate))
+
+    @abstractmethod
+    def shape(self, phase: np.ndarray) -> np.ndarray:
+        """Форма сигнала для фаз в долях периода [0, 1)."""
+
+    def _advance(self, n: int, step: float | np.ndarray) -> np.ndarray:
+        """Фазы очередных n отсчетов при шаге фазы step (в долях периода)."""
+
+        if isinstance(step, np.ndarray) and step.ndim:
+            phase = self.phase + np.cumsum(step) - step
+            last = phase[-1] + step[-1] if n else self.phase
+        else:
+            phase = self.phase + step * np.arange(n)
+            last = self.phase + step * n
+
+        self.phase = last % 1.0
+        return phase % 1.0
+
+
+class Sine(Waveform):
+    """Синусоидальный сигнал."""
+
+    def shape(self, phase: np.ndarray) -> np.ndarray:
+        return np.sin(2.0 * pi * phase)
+
+
+class Square(Waveform):
+    """Прямоугольный сигнал с коэффициентом заполнения duty."""
+
+    def __init__(self, freq: float, amplitude: float = 1.0, offset: float = 0.0,
+                       phase: float = 0.0, duty: float = 0.5) -> None:
+        super().__init__(freq, amplitude, offset, phase)
+        self.duty = duty
+
+    def shape(self, phase: np.ndarray) -> np.ndarray:
+        return np.where(phase < self.duty, 1.0, -1.0)
+
+
+class Sweep(Sine):
+    """Синусоидальный сигнал с линейно меняющейся от freq до stop частотой.
+
+    Частота нарастает за duration секунд, после чего качание повторяется.
+    """
+
+    def __init__(self, freq: float, stop: float, duration: float, amplitude: float = 1.0,
+                       offset: float = 0.0, phase: float = 0.0) -> None:
+        super().__init__(freq, amplitude, offset, phase)
+        self.stop = stop
+        self.duration = duration
+        self.time = 0.0             # время от начала текущего качания
+
+    def __call__(self, n: int, rate: float) -> np.ndarray:
+        elapsed = (self.time + np.arange(n) / rate) % self.duration
+        self.time = (self.time + n / rate) % self.duration
+
+        freq = self.freq + (self.stop - self.freq) * elapsed / self.duration
+        return self.offset + self.amplitude * self.shape(self._advance(n, freq / rate))
+
+
+class Table(Waveform):
+    """Произвольный периодический сигнал, заданный таблицей за один период.
+
+    Таблица воспроизводится с частотой freq с линейной интерполяцией; при
+    freq=None на каждый отсчет ЦАП выводится очередной элемент таблицы.
+    """
+
+    def __init__(self, table: Sequence[float], freq: float | None = None, amplitude: float = 1.0,
+                       offset: float = 0.0, phase: float = 0.0) -> None:
+        super().__init__(freq or 0.0, amplitude, offset, phase)
+        self.table = np.append(table, table[0])     # замыкание периода для интерполяции
+
+    def __call__(self, n: int, rate: float) -> np.ndarray:
+        step = self.freq / rate if self.freq else 1.0 / (len(self.table) - 1)
+        return self.offset + self.amplitude * self.shape(self._advance(n, step))
+
+    def shape(self, phase: np.ndarray) -> np.ndarray:
+        return np.interp(phase * (len(self.table) - 1), np.arange(len(self.table)), self.table)
+
+
+Generator = Callable[[int, float], np.ndarray]
+Generators = Union[Generator, Sequence[Generator]]
+
+
+class DacWriter:
+    """Запись блоков сигнала в кольцевой буфер ЦАП.
+
+    Значения в вольтах переводятся в коды ЦАП с учетом веса младшего
+    разряда (ZGetDigitalResolutionDAC) и ослабления аттенюатора каждого
+    канала (ZSetAttenDAC) за один векторный проход и копируются в буфер
+    одним-двумя срезами с учетом перехода через его конец.
+    """
+
+    def __init__(self, zdev: ZET, buff: RingBuffer | None = None) -> None:
+        self.zdev = zdev
+
+        self._owner = buff is None
+        self.buff = zdev.get_buffer_dac() if buff is None else buff
+        self.words = self.buff.words
+        self.channels = tuple(channel for channel in range(zdev.ZGetQuantityChannelDAC())
+                                      if zdev.ZGetOutputDAC(channel))
+        self.nchannels = max(len(self.channels), 1)
+        self.rate = zdev.ZGetFreqDAC()                  # кадров в секунду
+
+        resolution = zdev.ZGetDigitalResolutionDAC()
+        atten = [zdev.ZGetAttenDAC(channel) or 1.0 for channel in self.channels] or [1.0]
+        self.scale = 1.0 / (resolution * np.array(atten))
+
+        self._array: np.ndarray | None = self.buff.array
+        self._length = len(self._array)
+        self._limits = np.iinfo(self._array.dtype)
+        self.cursor = 0             # позиция записи в отсчетах от начала вывода
+
+    @property
+    def position(self) -> int:
+        """Позиция записи в буфере в 16-разрядных словах (как у ZGetPointerDAC)."""
+
+        return self.cursor % self._length * self.words
+
+    @property
+    def length(self) -> int:
+        """Размер буфера в кадрах."""
+
+        return self._length // self.nchannels
+
+    def close(self) -> None:
+        """Освободить буфер ЦАП, если он был запрошен самим объектом."""
+
+        self._array = None
+        if self._owner and not self.buff.released:
+            self.zdev.ZRemBufferDAC(self.buff)
+
+    def write(self, volts: np.ndarray) -> int:
+        """Записать блок значений в вольтах формы (кадры,) или (кадры, каналы).
+
+        Одномерный блок выводится во все включенные каналы. Возвращает
+        количество записанных кадров.
+        """
+
+        volts = np.asarray(volts, dtype=np.float64)
+        frames = len(volts)
+        if volts.ndim == 1:
+            volts = volts[:, np.newaxis]
+
+        codes = np.rint(np.broadcast_to(volts * self.scale, (frames, self.nchannels)))
+        np.clip(codes, self._limits.min, self._limits.max, out=codes)
+        self.write_codes(codes.astype(self.buff.array.dtype).ravel())
+
+        return frames
+
+    def write_codes(self, codes: np.ndarray) -> None:
+        """Записать уже перемеженные по каналам коды ЦАП в позицию записи."""
+
+        if (array := self._array) is None:
+            msg = "DAC writer is closed"
+            raise ZetError(msg)
+        if self.buff.released:
+            msg = "DAC buffer has been released"
+            raise ZetError(msg)
+
+        offset = self.cursor % self._length
+        first = min(len(codes), self._length - offset)
+
+        array[offset:offset + first] = codes[:first]
+        array[:len(codes) - first] = codes[first:]
+        self.cursor += len(codes)
+
+    def fill(self, generator: Generators, frames: int) -> int:
+        """Сгенерировать и записать frames кадров.
+
+        generator - один генератор для всех каналов или по генератору на
+        каждый включенный канал.
+        """
+
+        if callable(generator):
+            return self.write(generator(frames, self.rate))
+
+        return self.write(np.column_stack([gen(frames, self.rate) for gen in generator]))
+
+
+class DacFeeder:
+    """Фоновая подкачка сигнала в буфер ЦАП.
+
+    Поток владеет позицией записи DacWriter: поддерживает запас от low до
+    high кадров впереди позиции вывода (ZGetPointerDAC), дописывая пакеты
+    кратные размеру прерывания ЦАП (ZGetInterruptDAC), и засыпает до
+    момента, когда при частоте ZGetFreqDAC запас опустится до low.
+    Запускать поток следует после ZStartDAC, предварительно заполнив
+    буфер методом prime().
+    """
+
+    def __init__(self, writer: DacWriter, generator: Generators, latency: float = 0.25,
+                       low: int | None = None, high: int | None = None,
+                       min_sleep: float = 0.001) -> None:
+        self.writer = writer
+        self.generator = generator
+        self.min_sleep = min_sleep
+
+        zdev = writer.zdev
+        self.packet = max(zdev.ZGetInterruptDAC() // writer.words // writer.nchannels, 1)
+        if high is None:
+            high = min(max(int(writer.rate * latency), 2 * self.packet), writer.length - self.packet)
+        self.high = high
+        self.low = high // 2 if low is None else low
+
+        self.refills = 0            # количество подкачек
+        self.frames = 0             # записано кадров
+        self.underruns = 0          # вывод догонял позицию записи
+        self.wakeups = 0
+        self.buffered = 0           # запас кадров при последнем пробуждении
+        self.min_buffered: int | None = None
+        self.late_max = 0.0         # макс. опоздание пробуждения, с
+        self._late_sum = 0.0
+        self.error: Exception | None = None
+        self.metrics = zdev.metrics     # показатели запаса и опустошений буфера
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._reader: RingPointer | None = None     # позиция вывода (создается при запуске)
+
+    def __enter__(self) -> DacFeeder:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.stop()
+
+    def prime(self) -> int:
+        """Заполнить буфер до high кадров перед запуском ЦАП."""
+
+        frames = max(self.high - self.writer.cursor // self.writer.nchannels, 0)
+        return self._refill(frames)
+
+    def start(self) -> None:
+        """Запустить поток подкачки."""
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="DacFeeder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановить поток подкачки; ошибка драйвера в потоке возбуждается здесь."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if (error := self.error) is not None:
+            self.error = None
+            raise error
+
+    def stats(self) -> dict[str, float]:
+        """Счетчики и статистика времени пробуждений потока."""
+
+        return {"refills": self.refills,
+                "frames": self.frames,
+                "underruns": self.underruns,
+                "wakeups": self.wakeups,
+                "buffered": self.buffered,
+                "min_buffered": self.min_buffered or 0,
+                "late_mean": self._late_sum / self.wakeups if self.wakeups else 0.0,
+                "late_max": self.late_max}
+
+    def _refill(self, frames: int) -> int:
+        frames = -(-frames // self.packet) * self.packet
+        self.writer.fill(self.generator, frames)
+        self.refills += 1
+        self.frames += frames
+        return frames
+
+    def _run(self) -> None:
+        writer = self.writer
+        nchannels = writer.nchannels
+        if (reader := self._reader) is None:
+            # Один указатель на все время работы: после stop() и start() круги
+            # буфера, пройденные выводом, восстанавливаются по времени
+            reader = self._reader = RingPointer(writer.zdev.ZGetPointerDAC, writer.words,
+                                                writer.length * nchannels, writer.rate * nchannels)
+            # Позиция вывода на том же круге буфера, что и позиция записи
+            reader.position = writer.cursor - (writer.cursor - reader.pointer) % reader.length
+        deadline = time.perf_counter()
+
+        try:
+            while not self._stop.is_set():
+                late = time.perf_counter() - deadline
+                self._late_sum += late
+                self.late_max = max(self.late_max, late)
+                self.wakeups += 1
+
+                played = reader.update()
+                if (ahead := writer.cursor - played) < 0:
+                    # Вывод обогнал запись: продолжить с текущей позиции вывода
+                    self.underruns += 1
+                    if self.metrics is not None:
+                        self.metrics.count("dac.underruns")
+                    writer.cursor = -(-played // nchannels) * nchannels
+                    ahead = 0
+
+                buffered = self.buffered = ahead // nchannels
+                if self.min_buffered is None or buffered < self.min_buffered:
+                    self.min_buffered = buffered
+                if self.metrics is not None:
+                    self.metrics.gauge("dac.buffered", buffered)
+
+                if buffered <= self.low:
+                    buffered += self._refill(self.high - buffered)
+
+                delay = max((buffered - self.low) / writer.rate, self.min_sleep)
+                deadline = time.perf_counter() + delay
+                self._stop.wait(delay)
+        except Exception as error:      # noqa: BLE001
+            self.error = error
+
+
+__all__ = ["DacFeeder", "DacWriter", "Sine", "Square", "Sweep", "Table", "Waveform"]
@@ -0,0 +1,226 @@
+#! /usr/bin/env python3
+
+"""Понижение частоты дискретизации потока АЦП."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Iterator
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import ArrayLike
+
+from zet.client import ZetError
+from zet.convert import Converter
+
+if TYPE_CHECKING:
+    from zet.stream import AdcStream
+
+
+class Decimator(ABC):
+    """Звено понижения частоты в ratio раз.
+
+    process(x) получает очередные кадры формы (кадры, каналы) и
+    возвращает выходные кадры, полученные из них; состояние фильтра
+    между вызовами сохраняется, поэтому результат не зависит от разбиения
+    потока на блоки. Звенья с codes=True принимают только целые коды АЦП.
+    """
+
+    ratio = 1
+    codes = False
+
+    @abstractmethod
+    def process(self, x: np.ndarray) -> Any:
+        """Выходные кадры для очередных кадров x."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Сбросить состояние фильтра."""
+
+
+class FirDecimator(Decimator):
+    """КИХ-фильтр нижних частот с прореживанием (полифазная схема:
+    вычисляются только сохраняемые выходные отсчеты).
+
+    По умолчанию используется фильтр из 8*ratio+1 коэффициентов с окном
+    Блэкмана и частотой среза 0,8 от новой частоты Найквиста.
+    """
+
+    def __init__(self, ratio: int, taps: ArrayLike | None = None) -> None:
+        self.ratio = ratio
+        if taps is None:
+            taps = lowpass(8 * ratio + 1, 0.8 / ratio)
+        self.taps = np.asarray(taps, dtype=np.float64)[::-1].copy()
+        self.reset()
+
+    def reset(self) -> None:
+        self._history: np.ndarray | None = None     # последние len(taps)-1 кадров
+        self._phase = 0             # смещение следующего выходного отсчета
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        if self._history is None:
+            self._history = np.zeros((len(self.taps) - 1, x.shape[1]))
+        if not len(x):
+            return np.empty((0, x.shape[1]))
+
+        data = np.concatenate((self._history, x))
+        windows = sliding_window_view(data, len(self.taps), axis=0)[self._phase::self.ratio]
+        y = np.einsum("fcj,j->fc", windows, self.taps)
+
+        consumed = len(x) - self._phase
+        self._phase = -consumed % self.ratio
+        self._history = data[len(data) - len(self.taps) + 1:].copy()
+        return y
+
+
+class CicDecimator(Decimator):
+    """Фильтр CIC порядка order с прореживанием в ratio раз.
+
+    Интеграторы и гребенчатые звенья работают с целыми числами по
+    модулю 2**64, поэтому фильтр точен на кодах АЦП при любой длительности
+    работы; результат нормируется на коэффициент передачи ratio**order.
+    Значения с плавающей точкой (например, вольты) не принимаются.
+    """
+
+    codes = True
+
+    def __init__(self, ratio: int, order: int = 3) -> None:
+        self.ratio = ratio
+        self.order = order
+        self.gain = float(ratio) ** order
+        self.reset()
+
+    def reset(self) -> None:
+        self._integrators: np.ndarray | None = None     # (звено, канал)
+        self._combs: np.ndarray | None = None
+        self._phase = 0
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x)
+        if not np.issubdtype(x.dtype, np.integer):
+            msg = f"CIC decimator needs integer ADC codes, got {x.dtype}"
+            raise ZetError(msg)
+        if self._integrators is None or self._combs is None:
+            self._integrators = np.zeros((self.order, x.shape[1]), np.int64)
+            self._combs = np.zeros((self.order, x.shape[1]), np.int64)
+        integrators, combs = self._integrators, self._combs
+
+        with np.errstate(over="ignore"):
+            value = x.astype(np.int64)
+            for stage in range(self.order):
+                np.cumsum(value, axis=0, out=value)
+                value += integrators[stage]
+                if len(value):
+                    integrators[stage] = value[-1]
+
+            value = value[self._phase::self.ratio]
+            self._phase = (self._phase - len(x)) % self.ratio
+
+            for stage in range(self.order):
+                previous = np.concatenate((combs[stage][np.newaxis], value[:-1]))
+                if len(value):
+                    combs[stage] = value[-1]
+                value = value - previous
+
+        return value / self.gain
+
+
+class Envelope(Decimator):
+    """Минимум, максимум и среднее по каждым ratio кадрам (для графиков).
+
+    process возвращает кортеж (min, max, mean) массивов формы
+    (кадры, каналы); неполная группа кадров переносится в следующий вызов.
+    """
+
+    def __init__(self, ratio: int) -> None:
+        self.ratio = ratio
+        self.reset()
+
+    def reset(self) -> None:
+        self._rest: np.ndarray | None = None
+
+    def process(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        x = np.asarray(x)
+        if self._rest is not None and len(self._rest):
+            x = np.concatenate((self._rest, x))
+
+        whole = len(x) // self.ratio * self.ratio
+        groups = x[:whole].reshape(-1, self.ratio, x.shape[1])
+        self._rest = x[whole:].copy()
+        return groups.min(axis=1), groups.max(axis=1), groups.mean(axis=1)
+
+
+class Cascade(Decimator):
+    """Последовательное соединение звеньев (например, CIC и КИХ)."""
+
+    def __init__(self, *stages: Decimator) -> None:
+        self.stages = stages
+        self.ratio = int(np.prod([stage.ratio for stage in stages]))
+        self.codes = bool(stages) and stages[0].codes
+
+    def reset(self) -> None:
+        for stage in self.stages:
+            stage.reset()
+
+    def process(self, x: np.ndarray) -> Any:
+        for stage in self.stages:
+            x = stage.process(x)
+        return x
+
+
+def lowpass(numtaps: int, cutoff: float) -> np.ndarray:
+    """Коэффициенты КИХ-фильтра нижних частот (окно Блэкмана) с частотой
+    среза cutoff в долях частоты Найквиста и единичным усилением на
+    нулевой частоте.
+    """
+
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+    taps = cutoff * np.sinc(cutoff * n) * np.blackman(numtaps)
+    return taps / taps.sum()
+
+
+class DecimatedStream:
+    """Поток АЦП с пониженной частотой: блоки переводятся в вольты
+    (Converter) и пропускаются через decimator.
+
+    Звенья, работающие с целыми кодами (decimator.codes, например CIC),
+    всегда получают коды АЦП, а результат переводится в вольты после
+    прореживания (перевод линейный, поэтому результат тот же).
+    """
+
+    def __init__(self, stream: AdcStream, decimator: Decimator,
+                       converter: Converter | None = None, volts: bool = True) -> None:
+        self.stream = stream
+        self.decimator = decimator
+        self.converter = converter or Converter.from_device(stream.zdev, stream.channels)
+        self.volts = volts and not decimator.codes  # False - в decimator передаются коды АЦП
+        self.rate = stream.rate / stream.nchannels / decimator.ratio     # кадров в секунду
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        while (data := self.read()) is None:
+            self.stream.wait_for_samples(self.stream.min_frames)
+        return data
+
+    def read(self) -> Any:
+        """Обработать новые данные потока без ожидания или вернуть None."""
+
+        if (block := self.stream.read()) is None:
+            return None
+
+        if self.volts:
+            return self.decimator.process(self.converter.convert(block))
+
+        scale, offset = self.converter.scale, self.converter.offset
+        parts = [self.decimator.process(part) for part in block.parts]
+        if isinstance(parts[0], tuple):
+            return tuple(np.concatenate(column) * scale + offset for column in zip(*parts))
+        return np.concatenate(parts) * scale + offset
+
+
+__all__ = ["Cascade", "CicDecimator", "DecimatedStream", "Decimator", "Envelope",
+           "FirDecimator", "lowpass"]
@@ -0,0 +1,208 @@
+#! /usr/bin/env python3
+
+"""Сбор показателей работы драйвера и потоков данных."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+SUB_BITS = 5                # значащих бит значения в гистограмме (точность ~3%)
+MAX_BITS = 40               # значения до 2**40 нс (~18 мин)
+
+
+class Histogram:
+    """Гистограмма с логарифмически-линейными интервалами (как HdrHistogram).
+
+    Значения (целые, обычно наносекунды) хранятся с относительной
+    точностью 2**-(SUB_BITS-1) в массиве фиксированного размера; значения
+    больше 2**MAX_BITS учитываются в последнем интервале.
+    """
+
+    __slots__ = ("_lock", "count", "counts", "max", "min", "total")
+
+    _half = 1 << (SUB_BITS - 1)
+    _size = (MAX_BITS - SUB_BITS + 2) * _half
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()   # record вызывается из разных потоков
+        self.counts = [0] * self._size
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        """Учесть значение."""
+
+        shift = max(value.bit_length() - SUB_BITS, 0)
+        index = min(shift * self._half + (value >> shift), self._size - 1)
+        with self._lock:
+            self.counts[index] += 1
+
+            if not self.count or value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+            self.count += 1
+            self.total += value
+
+    def reset(self) -> None:
+        """Обнулить гистограмму."""
+
+        with self._lock:
+            self.counts = [0] * self._size
+            self.count = 0
+            self.total = 0
+            self.min = 0
+            self.max = 0
+
+    def percentile(self, percent: float) -> int:
+        """Значение, не превышаемое percent процентами учтенных значений
+        (верхняя граница интервала).
+        """
+
+        with self._lock:
+            return self._percentile(percent)
+
+    def snapshot(self) -> dict[str, float]:
+        """Количество, среднее, экстремумы и процентили."""
+
+        with self._lock:
+            return {"count": self.count,
+                    "mean": self.total / self.count if self.count else 0.0,
+                    "min": self.min,
+                    "max": self.max,
+                    "p50": self._percentile(50),
+                    "p90": self._percentile(90),
+                    "p99": self._percentile(99),
+                    "p999": self._percentile(99.9)}
+
+    def _percentile(self, percent: float) -> int:
+        if not self.count:
+            return 0
+
+        rank = max(percent / 100.0 * self.count, 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                shift = max(index // self._half - 1, 0)
+                upper = ((index - shift * self._half + 1) << shift) - 1
+                return min(upper, self.max)
+        return self.max
+
+
+class Metrics:
+    """Набор счетчиков, показаний (gauge) и гистограмм.
+
+    Время вызовов функций драйвера (в наносекундах) учитывается в
+    гистограммах "call.<функция>", ненулевые коды завершения - в счетчиках
+    "error.<функция>". Потоки данных добавляют показания отставания и
+    счетчики переполнений. snapshot() возвращает текущее состояние,
+    publish() передает его функциям, зарегистрированным subscribe();
+    start(period) публикует его периодически из фонового потока.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[dict[str, Any]], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Увеличить счетчик name на value."""
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """Запомнить текущее показание name."""
+
+        with self._lock:
+            self.gauges[name] = value
+
+    def histogram(self, name: str) -> Histogram:
+        """Гистограмма name (создается при первом обращении)."""
+
+        if (histogram := self.histograms.get(name)) is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def timed(self, name: str, func: Callable[..., int]) -> Callable[..., int]:
+        """Функция драйвера, время вызова и ошибки которой учитываются."""
+
+        record = self.histogram(f"call.{name}").record
+        error = f"error.{name}"
+        clock = time.perf_counter_ns
+
+        def call(*arguments: Any) -> int:
+            start = clock()
+            ret = func(*arguments)
+            record(clock() - start)
+            if ret:
+                self.count(error)
+            return ret
+
+        return call
+
+    def snapshot(self) -> dict[str, Any]:
+        """Текущие значения всех показателей."""
+
+        with self._lock:
+            counters, gauges = dict(self.counters), dict(self.gauges)
+            histograms = list(self.histograms.items())
+        return {"time": time.time(),
+                "counters": counters,
+                "gauges": gauges,
+                "histograms": {name: histogram.snapshot() for name, histogram in histograms}}
+
+    def reset(self) -> None:
+        """Обнулить счетчики и гистограммы."""
+
+        with self._lock:
+            self.counters.clear()
+            histograms = list(self.histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+    def subscribe(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Зарегистрировать получателя снимков показателей."""
+
+        self._callbacks.append(callback)
+
+    def publish(self) -> dict[str, Any]:
+        """Передать снимок показателей всем получателям."""
+
+        snapshot = self.snapshot()
+        for callback in self._callbacks:
+            callback(snapshot)
+        return snapshot
+
+    def start(self, period: float = 1.0) -> None:
+        """Публиковать показатели каждые period секунд из фонового потока."""
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(period,),
+                                        name="Metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановить периодическую публикацию."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, period: float) -> None:
+        while not self._stop.wait(period):
+            self.publish()
+
+
+__all__ = ["Histogram", "Metrics"]
@@ -0,0 +1,202 @@
+#! /usr/bin/env python3
+
+"""Обработка блоков АЦП в отдельных процессах через разделяемую память."""
+
+from __future__ import annotations
+
+import collections
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Tuple
+
+import numpy as np
+
+from zet.client import ZetError
+from zet.convert import Converter
+
+if TYPE_CHECKING:
+    from zet.stream import AdcStream, Block
+
+Kernel = Callable[[np.ndarray, Dict[str, Any]], Any]
+Result = Tuple[str, int, Any]       # (ядро, номер первого кадра блока, результат)
+
+# Состояние процесса-обработчика
+_ring: np.ndarray | None = None
+_memory: shared_memory.SharedMemory | None = None
+_kernels: dict[str, Kernel] = {}
+_context: dict[str, Any] = {}
+
+
+def _attach(name: str, shape: tuple[int, int], dtype: str, kernels: dict[str, Kernel],
+            context: dict[str, Any]) -> None:
+    """Подключить процесс-обработчик к разделяемому буферу."""
+
+    global _ring, _memory
+    _memory = shared_memory.SharedMemory(name=name)
+    _ring = np.ndarray(shape, dtype, buffer=_memory.buf)
+    _kernels.update(kernels)
+    _context.update(context)
+
+
+def _run(kernel: str, start: int, count: int) -> Any:
+    """Выполнить ядро над кадрами [start, start+count) разделяемого буфера."""
+
+    if _ring is None:
+        msg = "offload worker is not attached to the shared buffer"
+        raise ZetError(msg)
+    return _kernels[kernel](_ring[start:start + count], _context)
+
+
+def block_rms(data: np.ndarray, context: dict[str, Any]) -> np.ndarray:
+    """СКЗ каналов блока, В."""
+
+    volts = data * context["scale"] + context["offset"]
+    return np.sqrt(np.mean(volts ** 2, axis=0))
+
+
+def block_peak(data: np.ndarray, context: dict[str, Any]) -> np.ndarray:
+    """Максимальное абсолютное значение каналов блока, В."""
+
+    volts = data * context["scale"] + context["offset"]
+    return np.abs(volts).max(axis=0)
+
+
+class OffloadPool:
+    """Обработка блоков потока АЦП ядрами в пуле процессов.
+
+    Каждый новый блок один раз копируется в кольцевой буфер в разделяемой
+    памяти (multiprocessing.shared_memory); процессам передаются только
+    имя ядра и положение блока в буфере, обратно - результат ядра.
+    Ядро - функция уровня модуля kernel(data, context), где data - коды
+    АЦП формы (кадры, каналы), context - словарь с частотой (freq),
+    номерами каналов (channels) и коэффициентами перевода в вольты
+    (scale, offset).
+
+    Участок буфера освобождается при передаче следующих блоков (submit,
+    process) или опросе results(), когда ядра этого и всех предыдущих
+    блоков завершены; если места нет, блок отбрасывается (счетчик
+    dropped), так что цикл сбора данных никогда не ждет обработчиков.
+    Результаты хранятся до их получения методом results().
+    """
+
+    def __init__(self, stream: AdcStream, kernels: Mapping[str, Kernel],
+                       workers: int | None = None, frames: int | None = None,
+                       converter: Converter | None = None) -> None:
+        self.stream = stream
+        self.kernels = dict(kernels)
+        self.workers = workers or os.cpu_count() or 1
+        self.frames = frames or 4 * len(stream.buff) // stream.nchannels   # размер буфера в кадрах
+
+        converter = converter or Converter.from_device(stream.zdev, stream.channels)
+        self.context = {"freq": stream.rate / stream.nchannels, "channels": stream.channels,
+                        "scale": converter.scale, "offset": converter.offset}
+
+        dtype = stream.buff.array.dtype
+        self._memory = shared_memory.SharedMemory(create=True,
+                                                  size=self.frames * stream.nchannels * dtype.itemsize)
+        self._ring = np.ndarray((self.frames, stream.nchannels), dtype, buffer=self._memory.buf)
+        self._executor: ProcessPoolExecutor | None = ProcessPoolExecutor(
+            self.workers, initializer=_attach,
+            initargs=(self._memory.name, self._ring.shape, dtype.str, self.kernels, self.context))
+
+        # Блоки, ядра которых еще занимают буфер, и завершенные блоки, ожидающие results()
+        self._jobs: collections.deque[tuple[int, int, list[tuple[str, Future]]]] = collections.deque()
+        self._done: collections.deque[tuple[int, list[tuple[str, Future]]]] = collections.deque()
+        self._head = 0              # начало свободного места
+        self._used = 0              # занято кадров (с учетом пропуска конца буфера)
+        self.submitted = 0          # передано блоков
+        self.dropped = 0            # отброшено блоков из-за нехватки места
+
+    def __enter__(self) -> OffloadPool:
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.close()
+
+    def submit(self, block: Block) -> bool:
+        """Скопировать блок в разделяемый буфер и передать ядрам."""
+
+        if (executor := self._executor) is None:
+            msg = "offload pool is closed"
+            raise ZetError(msg)
+
+        count = len(block)
+        if not count:
+            return True
+
+        self._reclaim()
+        start = self._head
+        skip = self.frames - start if start + count > self.frames else 0    # блок не разрывается
+        if count > self.frames or self._used + skip + count > self.frames:
+            self.dropped += 1
+            return False
+        if skip:
+            start = 0
+
+        offset = start
+        for part in block.parts:
+            self._ring[offset:offset + len(part)] = part
+            offset += len(part)
+
+        futures = [(name, executor.submit(_run, name, start, count)) for name in self.kernels]
+        self._jobs.append((block.index, skip + count, futures))
+        self._head = (start + count) % self.frames
+        self._used += skip + count
+        self.submitted += 1
+        return True
+
+    def process(self) -> int:
+        """Передать обработчикам все новые данные потока; возвращает число блоков."""
+
+        submitted = 0
+        while (block := self.stream.read()) is not None:
+            submitted += self.submit(block)
+        return submitted
+
+    def results(self, wait: bool = False) -> list[Result]:
+        """Результаты завершенных блоков в порядке поступления блоков.
+
+        При wait=True ожидаются все переданные блоки. Ошибка ядра
+        возбуждается здесь.
+        """
+
+        self._reclaim(wait)
+        results: list[Result] = []
+        while self._done:
+            index, futures = self._done.popleft()
+            results.extend((name, index, future.result()) for name, future in futures)
+
+        return results
+
+    def _reclaim(self, wait: bool = False) -> None:
+        """Освободить участки буфера блоков, ядра которых завершены (по порядку)."""
+
+        while self._jobs:
+            index, size, futures = self._jobs[0]
+            if not wait and not all(future.done() for _, future in futures):
+                break
+
+            if wait:
+                for _, future in futures:
+                    future.exception()      # ожидание без возбуждения ошибки ядра
+            self._jobs.popleft()
+            self._used -= size
+            self._done.append((index, futures))
+
+    def close(self) -> None:
+        """Дождаться обработчиков, остановить их и освободить разделяемую память."""
+
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._jobs.clear()
+        self._done.clear()
+        del self._ring
+        self._memory.close()
+        self._memory.unlink()
+
+
+__all__ = ["OffloadPool", "block_peak", "block_rms"]
@@ -0,0 +1,376 @@
+#! /usr/bin/env python3
+
+"""Передача блоков АЦП потребителям через очереди ограниченного размера."""
+
+from __future__ import annotations
+
+import collections
+import threading
+from typing import TYPE_CHECKING, Callable, Iterable
+
+import numpy as np
+
+from zet.client import ZetError
+
+if TYPE_CHECKING:
+    from zet.metrics import Metrics
+    from zet.stream import AdcStream
+
+BLOCK = "block"                 # ждать освобождения места (чтение может переполнить буфер драйвера)
+DROP_OLDEST = "drop_oldest"     # отбросить самый старый блок очереди
+DROP_NEWEST = "drop_newest"     # отбросить поступающий блок
+DECIMATE = "decimate"           # отбросить каждый второй блок очереди
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, DECIMATE)
+
+
+class PooledBlock:
+    """Копия блока АЦП в буфере из пула BlockPool.
+
+    Буфер возвращается в пул, когда release() вызван всеми получателями
+    блока; после этого data использовать нельзя.
+    """
+
+    __slots__ = ("_pool", "_refs", "buffer", "frames", "index", "lost", "time")
+
+    def __init__(self, pool: BlockPool, buffer: np.ndarray) -> None:
+        self._pool = pool
+        self._refs = 0
+        self.buffer = buffer
+        self.frames = 0
+        self.index = 0              # номер первого кадра (как Block.index)
+        self.lost = 0
+        self.time = 0.0
+
+    def __len__(self) -> int:
+        return self.frames
+
+    @property
+    def data(self) -> np.ndarray:
+        """Кадры блока формы (кадры, каналы)."""
+
+        return self.buffer[:self.frames]
+
+    def release(self) -> None:
+        """Сообщить, что получатель закончил работу с блоком."""
+
+        self._pool.release(self)
+
+
+class BlockPool:
+    """Набор заранее выделенных буферов для блоков АЦП."""
+
+    def __init__(self, count: int, frames: int, nchannels: int, dtype: np.dtype) -> None:
+        self.frames = frames
+        self.nchannels = nchannels
+        self.dtype = dtype
+        self.count = 0
+        self._free: list[PooledBlock] = []
+        self._lock = threading.Condition()
+        self.grow(count)
+
+    def grow(self, count: int) -> None:
+        """Добавить в пул count буферов."""
+
+        blocks = [PooledBlock(self, np.empty((self.frames, self.nchannels), self.dtype))
+                  for _ in range(count)]
+        with self._lock:
+            self._free.extend(blocks)
+            self.count += count
+            self._lock.notify_all()
+
+    def acquire(self, timeout: float | None = None) -> PooledBlock | None:
+        """Взять свободный буфер, ожидая не дольше timeout секунд."""
+
+        with self._lock:
+            if not self._lock.wait_for(lambda: self._free, timeout):
+                return None
+            return self._free.pop()
+
+    def release(self, block: PooledBlock, refs: int = 1) -> None:
+        with self._lock:
+            block._refs -= refs
+            if block._refs <= 0:
+                block._refs = 0
+                self._free.append(block)
+                self._lock.notify()
+
+    def share(self, block: PooledBlock, refs: int) -> None:
+        """Задать число получателей блока."""
+
+        with self._lock:
+            block._refs = refs
+
+    @property
+    def available(self) -> int:
+        return len(self._free)
+
+
+class BoundedQueue:
+    """Очередь блоков фиксированной емкости с политикой переполнения policy.
+
+    Каждый отброшенный блок учитывается в dropped (и в счетчике name
+    показателей metrics) и возвращается в пул.
+    """
+
+    def __init__(self, capacity: int, policy: str = DROP_OLDEST) -> None:
+        if policy not in POLICIES:
+            msg = f"unknown overflow policy {policy!r}"
+            raise ZetError(msg)
+        if capacity < 1:
+            msg = "queue capacity must be positive"
+            raise ZetError(msg)
+
+        self.capacity = capacity
+        self.policy = policy
+        self.dropped = 0
+        self.put_count = 0
+        self.max_size = 0           # наибольшая длина очереди
+        self._items: collections.deque[PooledBlock] = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.metrics: Metrics | None = None
+        self.name = "pipeline.dropped"
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, block: PooledBlock) -> bool:
+        """Поставить блок в очередь; False, если отброшен сам блок."""
+
+        with self._cond:
+            self.put_count += 1
+            if len(self._items) >= self.capacity:
+                if self.policy == BLOCK:
+                    self._cond.wait_for(lambda: len(self._items) < self.capacity or self._closed)
+                elif self.policy == DROP_NEWEST:
+                    self._drop(block)
+                    return False
+                elif self.policy == DROP_OLDEST:
+                    self._drop(self._items.popleft())
+                else:
+                    kept: collections.deque[PooledBlock] = collections.deque()
+                    for number, item in enumerate(self._items):
+                        if number % 2:
+                            self._drop(item)
+                        else:
+                            kept.append(item)
+                    self._items = kept
+                    while len(self._items) >= self.capacity:   # при емкости 1-2 прореживания мало
+                        self._drop(self._items.popleft())
+
+            if self._closed:
+                self._drop(block)
+                return False
+
+            self._items.append(block)
+            self.max_size = max(self.max_size, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: float | None = None) -> PooledBlock | None:
+        """Взять блок из очереди; None, если очередь закрыта или истек timeout."""
+
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            block = self._items.popleft()
+            self._cond.notify_all()
+            return block
+
+    def close(self) -> None:
+        """Закрыть очередь: ожидающие get и put завершаются."""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self) -> None:
+        """Вернуть в пул все блоки очереди (без учета в dropped)."""
+
+        with self._cond:
+            while self._items:
+                self._items.popleft().release()
+            self._cond.notify_all()
+
+    def _drop(self, block: PooledBlock) -> None:
+        self.dropped += 1
+        if self.metrics is not None:
+            self.metrics.count(self.name)
+        block.release()
+
+
+class Stage:
+    """Потребитель блоков, работающий в своем потоке со своей очередью.
+
+    consumer(block) вызывается для каждого блока очереди; блок
+    возвращается в пул после вызова.
+    """
+
+    def __init__(self, consumer: Callable[[PooledBlock], None], capacity: int = 8,
+                       policy: str = DROP_OLDEST, name: str | None = None) -> None:
+        self.consumer = consumer
+        self.queue = BoundedQueue(capacity, policy)
+        self.name = name or getattr(consumer, "__name__", "stage")
+        self.processed = 0
+        self.error: Exception | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"Stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.queue.close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.queue.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"processed": self.processed,
+                "dropped": self.queue.dropped,
+                "queued": len(self.queue),
+                "max_queued": self.queue.max_size}
+
+    def _run(self) -> None:
+        while (block := self.queue.get()) is not None:
+            try:
+                if self.error is None:
+                    self.consumer(block)
+                    self.processed += 1
+            except Exception as error:      # noqa: BLE001
+                self.error = error
+            finally:
+                block.release()
+
+
+class Pipeline:
+    """Чтение потока АЦП в отдельном потоке и раздача блоков стадиям.
+
+    Каждый блок один раз копируется из буфера драйвера в буфер пула
+    (не более frames кадров) и ставится в очереди всех стадий. Память
+    ограничена пулом из capacity*стадий+стадий+1 буферов, задержка -
+    емкостью очередей; при отставании потребителя действует политика
+    его очереди, а отброшенные блоки учитываются. Стадии можно добавлять
+    и удалять во время работы (add, remove).
+    """
+
+    def __init__(self, stream: AdcStream, stages: Iterable[Stage], frames: int | None = None) -> None:
+        self.stream = stream
+        self.stages = tuple(stages)
+        self.frames = frames or stream.max_frames or max(int(stream.rate / stream.nchannels / 10), 1)
+        stream.max_frames = min(stream.max_frames or self.frames, self.frames)
+
+        self.pool = BlockPool(1, self.frames, stream.nchannels, stream.buff.array.dtype)
+        self._needed = 1            # буферов для всех стадий и чтения
+        for stage in self.stages:
+            self._attach(stage)
+
+        self.blocks = 0             # прочитано блоков
+        self.starved = 0            # блоков, для которых пришлось ждать свободный буфер
+        self.error: Exception | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> Pipeline:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Запустить стадии и поток чтения."""
+
+        for stage in self.stages:
+            stage.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Pipeline", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановить чтение и стадии; ошибка чтения или стадии возбуждается здесь."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for stage in self.stages:
+            stage.stop()
+
+        for error in [self.error, *(stage.error for stage in self.stages)]:
+            if error is not None:
+                self.error = None
+                raise error
+
+    def add(self, stage: Stage) -> None:
+        """Добавить стадию; пул дополняется буферами для ее очереди."""
+
+        self._attach(stage)
+        if self._thread is not None:
+            stage.start()
+        self.stages = (*self.stages, stage)
+
+    def remove(self, stage: Stage) -> None:
+        """Остановить и удалить стадию (ее ошибка не возбуждается)."""
+
+        self.stages = tuple(item for item in self.stages if item is not stage)
+        stage.stop()
+        self._needed -= stage.queue.capacity + 1
+
+    def stats(self) -> dict[str, object]:
+        """Счетчики чтения и стадий."""
+
+        return {"blocks": self.blocks,
+                "starved": self.starved,
+                "free": self.pool.available,
+                "stages": {stage.name: stage.stats() for stage in self.stages}}
+
+    def _attach(self, stage: Stage) -> None:
+        stage.queue.metrics = self.stream.metrics
+        stage.queue.name = f"pipeline.{stage.name}.dropped"
+        self._needed += stage.queue.capacity + 1
+        if self._needed > self.pool.count:
+            self.pool.grow(self._needed - self.pool.count)
+
+    def _run(self) -> None:
+        stream = self.stream
+        try:
+            while not self._stop.is_set():
+                if (block := stream.read()) is None:
+                    stream.wait_for_samples(stream.min_frames, timeout=0.1)
+                    continue
+
+                if not (stages := self.stages):
+                    block = None
+                    continue
+
+                if (pooled := self.pool.acquire(0)) is None:
+                    self.starved += 1
+                    while not self._stop.is_set() and (pooled := self.pool.acquire(0.1)) is None:
+                        pass
+                    if pooled is None:
+                        break
+
+                offset = 0
+                for part in block.parts:
+                    pooled.buffer[offset:offset + len(part)] = part
+                    offset += len(part)
+                pooled.frames, pooled.index, pooled.lost, pooled.time = (
+                    offset, block.index, block.lost, block.time)
+                block = None
+
+                self.blocks += 1
+                if stream.metrics is not None:
+                    stream.metrics.gauge("pipeline.free", self.pool.available)
+                self.pool.share(pooled, len(stages))
+                for stage in stages:
+                    stage.queue.put(pooled)
+        except Exception as error:      # noqa: BLE001
+            self.error = error
+
+
+__all__ = ["BLOCK", "DECIMATE", "DROP_NEWEST", "DROP_OLDEST", "BlockPool", "BoundedQueue",
+           "Pipeline", "PooledBlock", "Stage"]
@@ -0,0 +1,180 @@
+#! /usr/bin/env python3
+
+"""Совместная работа с группой устройств ZetLab."""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Tuple, TypeVar
+
+from zet.client import ZET, Z_DEVICE, ZetError
+from zet.stream import AdcStream, Block
+
+if TYPE_CHECKING:
+    from zet.backend import Backend
+
+Address = Tuple[int, int]      # (тип устройства Z_DEVICE, номер DSP)
+T = TypeVar("T")
+
+
+class PoolBlock:
+    """Блоки данных нескольких устройств, полученные за один цикл опроса."""
+
+    __slots__ = ("blocks", "time", "times")
+
+    def __init__(self, blocks: dict[Address, Block], times: dict[Address, float],
+                       time: float) -> None:
+        self.blocks = blocks        # блоки по адресам устройств
+        self.times = times          # время первого кадра блока от старта АЦП, с
+        self.time = time            # время опроса (time.perf_counter)
+
+
+class ZetPool:
+    """Группа устройств, открываемых, запускаемых и опрашиваемых совместно.
+
+    Вызовы драйвера для разных устройств выполняются параллельно, данные
+    всех устройств читаются одним циклом опроса (см. blocks).
+    """
+
+    def __init__(self, addresses: Iterable[Address], locked: bool = False,
+                       backend: Backend | None = None) -> None:
+        self.devices = {(device, dsp): ZET(device, dsp, locked, backend)
+                        for device, dsp in addresses}
+        self.streams: dict[Address, AdcStream] = {}
+        self.synchronized = False
+        self.start_time = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=max(len(self.devices), 1),
+                                            thread_name_prefix="ZetPool")
+
+    def __enter__(self) -> ZetPool:
+        self.open()
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        try:
+            if self.streams:
+                self.stop_adc()
+            self.close()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def discover(devices: Iterable[int] = tuple(Z_DEVICE), dsps: Iterable[int] = range(8),
+                 backend: Backend | None = None) -> list[Address]:
+        """Найти пары (тип устройства, DSP), для которых успешно выполняется ZOpen."""
+
+        def probe(address: Address) -> bool:
+            zdev = ZET(*address, backend=backend)
+            try:
+                zdev.ZOpen()
+            except ZetError:
+                return False
+            zdev.ZClose()
+            return True
+
+        addresses = [(device, dsp) for device in devices for dsp in dsps]
+        with ThreadPoolExecutor(max_workers=min(len(addresses), 32) or 1) as executor:
+            found = list(executor.map(probe, addresses))
+
+        return [address for address, present in zip(addresses, found) if present]
+
+    def map(self, func: Callable[[ZET], T], addresses: Iterable[Address] | None = None) -> dict[Address, T]:
+        """Параллельно выполнить func для устройств группы."""
+
+        addresses = list(self.devices if addresses is None else addresses)
+        futures = [self._executor.submit(func, self.devices[address]) for address in addresses]
+        return {address: future.result() for address, future in zip(addresses, futures)}
+
+    def open(self) -> dict[Address, bool]:
+        """Подключиться к драйверу для всех устройств."""
+
+        return self.map(ZET.ZOpen)
+
+    def close(self) -> dict[Address, bool]:
+        """Отключиться от драйвера для всех устройств."""
+
+        return self.map(ZET.ZClose)
+
+    def start_adc(self, sync: bool = True, **kwargs: Any) -> bool:
+        """Запустить АЦП всех устройств.
+
+        Для каждого устройства создается AdcStream (параметры kwargs). При
+        sync=True первое устройство назначается ведущим (ZSetMasterSynchr),
+        остальные запускаются по внешнему старту (ZSetEnableExtStartADC) и
+        начинают накопление одновременно с ним. Если оборудование этого не
+        поддерживает, устройства запускаются параллельно без синхронизации.
+        Возвращает True, если запуск синхронизирован аппаратно.
+        """
+
+        self.streams = self.map(lambda zdev: AdcStream(zdev, **kwargs))
+        for stream in self.streams.values():
+            stream.poll()           # отсчет кадров ведется от позиции до старта
+
+        master, *slaves = self.devices
+        self.synchronized = sync and bool(slaves) and self._set_sync(master, slaves, True)
+
+        if self.synchronized:
+            self.map(ZET.ZStartADC, slaves)
+            self.devices[master].ZStartADC()
+        else:
+            self.map(ZET.ZStartADC)
+
+        self.start_time = time.perf_counter()
+        return self.synchronized
+
+    def stop_adc(self) -> None:
+        """Остановить АЦП всех устройств и освободить буферы потоков."""
+
+        self.map(ZET.ZStopADC)
+        if self.synchronized:
+            master, *slaves = self.devices
+            self._set_sync(master, slaves, False)
+            self.synchronized = False
+
+        for stream in self.streams.values():
+            stream.close()
+        self.streams = {}
+
+    def blocks(self, interval: float | None = None) -> Iterator[PoolBlock]:
+        """Новые данные всех устройств, опрашиваемых по очереди в одном цикле.
+
+        Без новых данных цикл спит до расчетного поступления порции драйвера
+        ближайшего устройства (AdcStream.wake_time), но не дольше interval
+        секунд, если он задан.
+        """
+
+        freqs = {address: stream.rate / stream.nchannels
+                 for address, stream in self.streams.items()}
+
+        while True:
+            blocks = {}
+            for address, stream in self.streams.items():
+                if (block := stream.read()) is not None:
+                    blocks[address] = block
+
+            if blocks:
+                times = {address: block.index / freqs[address] for address, block in blocks.items()}
+                yield PoolBlock(blocks, times, time.perf_counter())
+            else:
+                now = time.perf_counter()
+                delay = min(stream.wake_time(stream.min_frames) for stream in self.streams.values()) - now
+                time.sleep(max(min(delay, interval) if interval is not None else delay, 0.0))
+
+    def _set_sync(self, master: Address, slaves: list[Address], enable: bool) -> bool:
+        """Вкл./выкл. синхронного запуска ведомых устройств от ведущего."""
+
+        try:
+            self.devices[master].ZSetMasterSynchr(int(enable))
+            self.map(lambda zdev: zdev.ZSetEnableExtStartADC(int(enable)), slaves)
+        except ZetError:
+            if enable:
+                with contextlib.suppress(ZetError):
+                    self._set_sync(master, slaves, False)
+            return False
+
+        return True
+
+
+__all__ = ["PoolBlock", "ZetPool"]
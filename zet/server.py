@@ -0,0 +1,405 @@
+#! /usr/bin/env python3
+
+"""Сервер, передающий данные АЦП клиентам по TCP или Unix-сокету.
+
+Протокол (все числа little-endian):
+
+1. Клиент отправляет SUBSCRIBE: сигнатура, флаги (VOLTS - отсчеты в
+   вольтах float32, иначе коды АЦП), коэффициент прореживания и маска
+   номеров каналов устройства (0 - все включенные каналы).
+2. Сервер отвечает PREFACE: сигнатура, код ответа (OK или причина
+   отказа), флаги и коэффициент прореживания; при OK за ним следует
+   заголовок zet.capture.CaptureHeader выбранных каналов (частота в нем
+   уже с учетом прореживания).
+3. Далее сервер передает блоки: BLOCK (сигнатура, номер первого кадра
+   устройства, количество кадров, кадров потеряно при переполнении
+   буфера драйвера, блоков отброшено для этого клиента с начала работы)
+   и перемеженные по каналам отсчеты.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import struct
+import threading
+from typing import TYPE_CHECKING, Iterator, Sequence, Tuple, Union
+
+import numpy as np
+
+from zet.capture import HEADER, CaptureHeader
+from zet.client import ZetError
+from zet.convert import Converter
+from zet.decimate import CicDecimator, Decimator, FirDecimator
+from zet.pipeline import DROP_OLDEST, Pipeline, PooledBlock, Stage
+from zet.stream import AdcStream
+
+if TYPE_CHECKING:
+    from zet.client import ZET
+
+Address = Union[Tuple[str, int], str]   # (узел, порт) для TCP или путь Unix-сокета
+
+SUBSCRIBE = struct.Struct("<4sHHQ")
+PREFACE = struct.Struct("<4sHHH")
+BLOCK = struct.Struct("<4sQIII")
+SUBSCRIBE_MAGIC = b"ZSUB"
+PREFACE_MAGIC = b"ZSTR"
+BLOCK_MAGIC = b"ZBLK"
+
+VOLTS = 0x0001
+
+OK = 0
+BAD_REQUEST = 1
+BAD_CHANNELS = 2
+BUSY = 3
+
+
+def _socket(address: Address) -> socket.socket:
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    return socket.socket(family, socket.SOCK_STREAM)
+
+
+def _shutdown(sock: socket.socket) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    data = bytearray(size)
+    view = memoryview(data)
+    while view:
+        if not (count := sock.recv_into(view)):
+            msg = "connection closed by peer"
+            raise ConnectionError(msg)
+        view = view[count:]
+    return data
+
+
+class _Session:
+    """Подписка одного клиента: выбор каналов, прореживание и отправка."""
+
+    def __init__(self, conn: socket.socket, stream: AdcStream, converter: Converter,
+                       columns: list[int], volts: bool, decimation: int, capacity: int,
+                       name: str) -> None:
+        self.conn = conn
+        self.columns = None if columns == list(range(stream.nchannels)) else columns
+        self.volts = volts
+        self.dtype = np.dtype(np.float32) if volts else stream.buff.array.dtype
+        self.converter = Converter(converter.scale[columns], converter.offset[columns])
+        self.decimator: Decimator | None = None
+        if decimation > 1:
+            self.decimator = FirDecimator(decimation) if volts else CicDecimator(decimation)
+        self.stage = Stage(self.send, capacity, DROP_OLDEST, name=name)
+        self.closed = False
+        self.sent = 0               # передано блоков
+        self._next: int | None = None   # ожидаемый номер кадра следующего блока
+
+    def send(self, block: PooledBlock) -> None:
+        if self.closed:
+            return
+
+        if self.decimator is not None and block.index != self._next:
+            self.decimator.reset()      # пропуск данных: фильтр начинается заново
+        self._next = block.index + block.frames
+
+        data = block.data if self.columns is None else block.data[:, self.columns]
+        if self.volts:
+            data = self.converter.convert(data, dtype=np.float64 if self.decimator else np.float32)
+        if self.decimator is not None:
+            data = self.decimator.process(data)
+            if not len(data):
+                return
+            if not self.volts:
+                data = np.rint(data)
+        data = np.ascontiguousarray(data, self.dtype)
+
+        header = BLOCK.pack(BLOCK_MAGIC, block.index, len(data), block.lost, self.stage.queue.dropped)
+        try:
+            self.conn.sendall(header + data.tobytes())
+        except OSError:
+            self.closed = True
+            return
+        self.sent += 1
+
+    def close(self) -> None:
+        self.closed = True
+        _shutdown(self.conn)
+        self.conn.close()
+
+
+class StreamServer:
+    """Раздача данных потока АЦП устройства нескольким клиентам.
+
+    Сервер владеет потоком АЦП: start() создает AdcStream (с resync) и
+    запускает АЦП, stop() останавливает АЦП и отключает клиентов. Каналы,
+    частоту и усиление следует настроить до запуска. Блоки читаются
+    конвейером zet.pipeline.Pipeline; каждый клиент - отдельная стадия со
+    своей очередью на capacity блоков (политика drop_oldest), поэтому
+    медленный клиент теряет блоки (счетчик передается в BLOCK), но не
+    задерживает остальных. Выбор каналов, перевод в вольты и прореживание
+    выполняются в потоке клиента. Подписка (SUBSCRIBE/PREFACE) выполняется
+    в отдельном потоке для каждого подключения, поэтому медленный клиент
+    не задерживает прием остальных. Клиент, не приславший подписку или не
+    принимающий данные timeout секунд, отключается.
+    """
+
+    def __init__(self, zdev: ZET, address: Address, capacity: int = 16, frames: int | None = None,
+                       timeout: float = 5.0, max_clients: int = 32, backlog: int = 8) -> None:
+        self.zdev = zdev
+        self.capacity = capacity
+        self.frames = frames
+        self.timeout = timeout
+        self.max_clients = max_clients
+
+        self.stream: AdcStream | None = None
+        self.pipeline: Pipeline | None = None
+        self.converter: Converter | None = None
+        self.header: CaptureHeader | None = None
+        self.sessions: list[_Session] = []
+        self.accepted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()   # sessions, счетчики и _pending (потоки подписки)
+        self._pending: set[socket.socket] = set()   # подключения, ожидающие подписки
+
+        self._path = address if isinstance(address, str) else None
+        self._listener = _socket(address)
+        if not isinstance(address, str):
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(address)
+        self._listener.listen(backlog)
+        self._listener.settimeout(0.2)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> StreamServer:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.stop()
+
+    @property
+    def address(self) -> Address:
+        """Адрес сервера (с выбранным системой портом при port=0)."""
+
+        return self._listener.getsockname()
+
+    def start(self) -> None:
+        """Запустить АЦП, конвейер и прием клиентов."""
+
+        self.stream = stream = AdcStream(self.zdev, resync=True)
+        self.converter = converter = Converter.from_device(self.zdev, stream.channels)
+        self.header = header = CaptureHeader.from_stream(stream)
+        self.pipeline = pipeline = Pipeline(stream, (), self.frames)
+
+        stream.poll()
+        self.zdev.ZStartADC()
+        pipeline.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, args=(stream, converter, header, pipeline),
+                                        name="StreamServer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Отключить клиентов, остановить конвейер и АЦП."""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for conn in self._pending:
+                _shutdown(conn)     # ожидающий подписки поток завершается ошибкой приема
+            for session in self.sessions:
+                session.close()
+            self.sessions.clear()
+        self._listener.close()
+        if self._path is not None and os.path.exists(self._path):
+            os.unlink(self._path)
+
+        if (pipeline := self.pipeline) is not None:
+            try:
+                pipeline.stop()
+            finally:
+                self.zdev.ZStopADC()
+                self.pipeline = None
+                if self.stream is not None:
+                    self.stream.close()
+
+    def stats(self) -> dict[str, object]:
+        """Счетчики сервера, конвейера и клиентов."""
+
+        with self._lock:
+            sessions = list(self.sessions)
+        return {"accepted": self.accepted,
+                "rejected": self.rejected,
+                "pipeline": self.pipeline.stats() if self.pipeline is not None else {},
+                "clients": {session.stage.name: {"sent": session.sent,
+                                                 "dropped": session.stage.queue.dropped}
+                            for session in sessions}}
+
+    def _serve(self, stream: AdcStream, converter: Converter, header: CaptureHeader,
+                     pipeline: Pipeline) -> None:
+        while not self._stop.is_set():
+            self._reap(pipeline)
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            with self._lock:
+                self._pending.add(conn)
+            threading.Thread(target=self._handshake, args=(conn, stream, converter, header, pipeline),
+                             name="StreamServer-subscribe", daemon=True).start()
+
+    def _handshake(self, conn: socket.socket, stream: AdcStream, converter: Converter,
+                         header: CaptureHeader, pipeline: Pipeline) -> None:
+        try:
+            self._subscribe(conn, stream, converter, header, pipeline)
+        except (OSError, ZetError):
+            with self._lock:
+                self.rejected += 1
+            conn.close()
+        finally:
+            with self._lock:
+                self._pending.discard(conn)
+
+    def _subscribe(self, conn: socket.socket, stream: AdcStream, converter: Converter,
+                         header: CaptureHeader, pipeline: Pipeline) -> None:
+        conn.settimeout(self.timeout)
+        magic, flags, decimation, mask = SUBSCRIBE.unpack(_recv_exact(conn, SUBSCRIBE.size))
+
+        channels = stream.channels
+        if mask:
+            channels = tuple(channel for channel in range(64) if mask >> channel & 1)
+
+        with self._lock:
+            status = OK
+            if magic != SUBSCRIBE_MAGIC or decimation < 1:
+                status = BAD_REQUEST
+            elif not set(channels) <= set(stream.channels):
+                status = BAD_CHANNELS
+            elif self._stop.is_set() or len(self.sessions) >= self.max_clients:
+                status = BUSY
+            else:
+                self.accepted += 1
+                name = f"client{self.accepted}"
+
+        preface = PREFACE.pack(PREFACE_MAGIC, status, flags, decimation)
+        if status != OK:
+            conn.sendall(preface)
+            msg = f"subscription rejected ({status})"
+            raise ZetError(msg)
+
+        columns = [stream.channels.index(channel) for channel in channels]
+        subset = CaptureHeader(header.device, header.dsp, header.serial, header.words,
+                               header.freq / decimation, channels,
+                               tuple(header.resolution[column] for column in columns),
+                               tuple(header.amplify[column] for column in columns),
+                               tuple(header.preamplify[column] for column in columns),
+                               header.start_time)
+        conn.sendall(preface + subset.pack())
+
+        session = _Session(conn, stream, converter, columns, bool(flags & VOLTS), decimation,
+                           self.capacity, name)
+        with self._lock:
+            if self._stop.is_set():     # сервер остановлен во время подписки
+                session.close()
+                return
+            self.sessions.append(session)
+            pipeline.add(session.stage)
+
+    def _reap(self, pipeline: Pipeline) -> None:
+        with self._lock:
+            closed = [session for session in self.sessions if session.closed]
+            for session in closed:
+                self.sessions.remove(session)
+                pipeline.remove(session.stage)
+        for session in closed:
+            session.close()
+
+
+class StreamPacket:
+    """Блок данных, полученный от сервера."""
+
+    __slots__ = ("data", "dropped", "index", "lost")
+
+    def __init__(self, index: int, data: np.ndarray, lost: int, dropped: int) -> None:
+        self.index = index          # номер первого исходного кадра устройства
+        self.data = data            # отсчеты формы (кадры, каналы)
+        self.lost = lost            # кадров потеряно при переполнении буфера драйвера
+        self.dropped = dropped      # блоков отброшено сервером для этого клиента (всего)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class StreamClient:
+    """Подключение к StreamServer.
+
+    channels - номера каналов устройства (None - все включенные),
+    decimation - коэффициент прореживания, volts - получать отсчеты в
+    вольтах (float32) вместо кодов АЦП. Параметры записи (частота, каналы,
+    коэффициенты перевода кодов) доступны в header.
+    """
+
+    def __init__(self, address: Address, channels: Sequence[int] | None = None,
+                       decimation: int = 1, volts: bool = False,
+                       timeout: float | None = None) -> None:
+        self.sock = _socket(address)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+
+        mask = sum(1 << channel for channel in channels) if channels else 0
+        self.sock.sendall(SUBSCRIBE.pack(SUBSCRIBE_MAGIC, VOLTS if volts else 0, decimation, mask))
+
+        magic, status, flags, self.decimation = PREFACE.unpack(_recv_exact(self.sock, PREFACE.size))
+        if magic != PREFACE_MAGIC or status != OK:
+            self.sock.close()
+            msg = f"subscription rejected by server ({status})"
+            raise ZetError(msg)
+
+        head = _recv_exact(self.sock, HEADER.size)
+        size = HEADER.unpack_from(head)[2]
+        self.header = CaptureHeader.unpack(bytes(head + _recv_exact(self.sock, size - HEADER.size)))
+        self.volts = bool(flags & VOLTS)
+        self.dtype = np.dtype(np.float32) if self.volts else self.header.dtype
+        self.nchannels = len(self.header.channels)
+
+    def __enter__(self) -> StreamClient:
+        return self
+
+    def __exit__(self, exc_type: object, exc_value: object, traceback: object) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[StreamPacket]:
+        return self
+
+    def __next__(self) -> StreamPacket:
+        try:
+            return self.read()
+        except ConnectionError:
+            raise StopIteration from None
+
+    def read(self) -> StreamPacket:
+        """Принять следующий блок (ожидая его)."""
+
+        magic, index, frames, lost, dropped = BLOCK.unpack(_recv_exact(self.sock, BLOCK.size))
+        if magic != BLOCK_MAGIC:
+            msg = "stream out of sync"
+            raise ZetError(msg)
+
+        payload = _recv_exact(self.sock, frames * self.nchannels * self.dtype.itemsize)
+        data = np.frombuffer(payload, self.dtype).reshape(frames, self.nchannels)
+        return StreamPacket(index, data, lost, dropped)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+__all__ = ["BAD_CHANNELS", "BAD_REQUEST", "BUSY", "OK", "VOLTS", "StreamClient", "StreamPacket",
+           "StreamServer"]
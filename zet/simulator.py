@@ -0,0 +1,610 @@
+#! /usr/bin/env python3
+
+"""Программная модель устройств ZetLab для работы без оборудования.
+
+SimulatorBackend реализует все функции таблицы IDaqZDevice._functions_.
+Указатели буферов АЦП/ЦАП движутся в реальном времени с установленной
+частотой дискретизации порциями размера прерывания, данные АЦП
+генерируются по мере продвижения указателя. ReplayBackend так же
+воспроизводит файлы, записанные zet.capture.Recorder.
+
+    from zet.client import ZET, Z_DEVICE
+    from zet.simulator import SimulatorBackend
+
+    zdev = ZET(Z_DEVICE.ZET230, 0, backend=SimulatorBackend())
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from ctypes import c_long, memmove
+from functools import partial
+from math import pi
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Mapping, Tuple
+
+import numpy as np
+
+from zet.backend import Backend
+from zet.capture import CaptureReader
+from zet.client import Z_DEVICE
+
+if TYPE_CHECKING:
+    from _ctypes import _PyCFuncPtrType
+
+# Коды ошибок симулятора (коды настоящего драйвера не воспроизводятся)
+NO_DEVICE = 0x0001      # устройство отсутствует
+NOT_OPEN = 0x0002       # не выполнен ZOpen
+BAD_ARGUMENT = 0x0003   # недопустимый аргумент (в том числе индекс за концом списка)
+NO_BUFFER = 0x0004      # буфер не запрошен
+
+Signal = Callable[[np.ndarray, int], np.ndarray]
+
+
+def _value(arg: Any) -> Any:
+    """Значение аргумента, переданного по значению."""
+
+    return getattr(arg, "value", arg)
+
+
+def _output(arg: Any, value: Any) -> None:
+    """Записать значение в аргумент, переданный по ссылке (byref)."""
+
+    getattr(arg, "_obj", arg).value = value
+
+
+def _sine(t: np.ndarray, channel: int) -> np.ndarray:
+    """Сигнал по умолчанию: синус 10*(k+1) Гц амплитудой 1/(k+1) В в k-ом канале."""
+
+    return np.sin(2.0 * pi * 10.0 * (channel + 1) * t) / (channel + 1)
+
+
+class _Ring:
+    """Кольцевой буфер АЦП или ЦАП модели и положение его указателя."""
+
+    def __init__(self, device: SimDevice, kind: str) -> None:
+        self.device = device
+        self.kind = kind
+        self.array: np.ndarray | None = None
+        self.started = False
+        self.start_time = 0.0
+        self.filled = 0             # сгенерировано отсчетов от старта (АЦП)
+
+    @property
+    def words(self) -> int:
+        return self.device.params[f"Words{self.kind}"]
+
+    @property
+    def nchannels(self) -> int:
+        return max(self.device.number(self.kind), 1)
+
+    def allocate(self) -> np.ndarray:
+        frame = self.nchannels
+        length = max(self.device.params[f"BufferSize{self.kind}"] // self.words // frame, 1) * frame
+        self.array = np.zeros(length, np.int16 if self.words == 1 else np.int32)
+        return self.array
+
+    def start(self) -> None:
+        self.started = True
+        self.start_time = time.perf_counter()
+        self.filled = 0
+
+    def position(self) -> int:
+        """Позиция указателя в отсчетах от старта с точностью до прерывания."""
+
+        if not self.started:
+            return 0
+
+        params, nchannels = self.device.params, self.nchannels
+        elapsed = (time.perf_counter() - self.start_time) * self.device.speed
+        frames = int(elapsed * params[f"Freq{self.kind}"])
+        chunk = max(params[f"Interrupt{self.kind}"] // self.words // nchannels, 1)
+        return frames // chunk * chunk * nchannels
+
+    def pointer(self) -> int:
+        """Значение указателя драйвера (в 16-разрядных словах)."""
+
+        position = self.position()
+        if self.array is None:
+            return 0
+
+        if self.kind == "ADC":
+            self.fill(position)
+        return position % len(self.array) * self.words
+
+    def fill(self, position: int) -> None:
+        """Сгенерировать данные АЦП от последней позиции до position."""
+
+        if (array := self.array) is None:
+            return
+
+        length, nchannels = len(array), self.nchannels
+        start = max(self.filled, position - length)
+        if start >= position:
+            return
+
+        frame, number = np.divmod(np.arange(start, position), nchannels)
+        codes = self.device.generate(frame, number)
+
+        limits = np.iinfo(array.dtype)
+        codes = np.clip(np.rint(codes), limits.min, limits.max).astype(array.dtype)
+
+        offset = start % length
+        first = min(len(codes), length - offset)
+        array[offset:offset + first] = codes[:first]
+        array[:len(codes) - first] = codes[first:]
+        self.filled = position
+
+
+class SimDevice:
+    """Модель одного устройства (тип, DSP).
+
+    Параметры устройства хранятся в словаре params под именами функций
+    драйвера без префикса ZGet/ZSet (FreqADC, InterruptADC, InputADC...),
+    поканальные параметры - списками. Функции чтения и записи параметров
+    обрабатываются единообразно, особые функции реализованы методами с
+    именами функций драйвера.
+    """
+
+    def __init__(self, name: bytes = b"ZET230", serial: int = 1, quantity_adc: int = 4,
+                       quantity_dac: int = 2, words_adc: int = 2, words_dac: int = 1,
+                       bits_adc: int = 24, bits_dac: int = 16,
+                       list_freq_adc: tuple[float, ...] = (2500.0, 5000.0, 25000.0, 50000.0),
+                       list_freq_dac: tuple[float, ...] = (5000.0, 25000.0, 50000.0),
+                       list_amplify_adc: tuple[float, ...] = (1.0, 10.0, 100.0),
+                       list_preamplify_adc: tuple[float, ...] = (1.0,),
+                       resolution_adc: float = 1e-6, resolution_dac: float = 5e-4,
+                       signal: Signal = _sine) -> None:
+        self.name = name
+        self.signal = signal
+        self.lists = {"FreqADC": tuple(list_freq_adc), "FreqDAC": tuple(list_freq_dac),
+                      "AmplifyADC": tuple(list_amplify_adc),
+                      "PreAmplifyADC": tuple(list_preamplify_adc)}
+        self.params: dict[str, Any] = {
+            "SerialNumberDSP": serial, "TypeConnection": 1, "Error": 0, "Modify": 0, "Flag": 0,
+            "EnableADC": 1, "EnableDAC": int(quantity_dac > 0), "StartADC": 0, "StartDAC": 0,
+            "QuantityChannelADC": quantity_adc, "QuantityChannelDAC": quantity_dac,
+            "DigitalResolutionADC": resolution_adc, "DigitalResolutionDAC": resolution_dac,
+            "BitsADC": bits_adc, "BitsDAC": bits_dac, "WordsADC": words_adc, "WordsDAC": words_dac,
+            "FreqADC": list_freq_adc[-2 if len(list_freq_adc) > 1 else 0],
+            "FreqDAC": list_freq_dac[-2 if len(list_freq_dac) > 1 else 0],
+            "ExtFreqADC": 0.0, "ExtFreqDAC": 0.0,
+            "EnableExtFreq": 0, "EnableExtStart": 0, "EnableExtFreqADC": 0, "EnableExtFreqDAC": 0,
+            "EnableExtStartADC": 0, "EnableExtStartDAC": 0, "MasterSynchr": 0,
+            "InterruptADC": 512 * words_adc, "InterruptDAC": 512 * words_dac,
+            "MaxInterruptADC": 65536, "MaxInterruptDAC": 65536,
+            "SizePacketADC": 512, "SizePacketDAC": 512,
+            "MaxSizePacketADC": 4096, "MaxSizePacketDAC": 4096,
+            "QuantityPacketsADC": 1, "QuantityPacketsDAC": 1,
+            "MaxQuantityPacketsADC": 64, "MaxQuantityPacketsDAC": 64,
+            "BufferSizeADC": int(list_freq_adc[-1]) * quantity_adc * words_adc,
+            "BufferSizeDAC": int(list_freq_dac[-1]) * max(quantity_dac, 1) * words_dac,
+            "CycleSampleADC": 1, "CycleSampleDAC": 1, "ExtCycleDAC": 0,
+            "QuantityChannelDigPort": 8, "DigOutEnable": 0, "DigInput": 0, "DigOutput": 0,
+            "DigitalMode": 0, "FindPWM": 0, "FindHCPADC": 0, "FindSoftAtten": 1,
+            "MaxSizeBufferDSPDAC": 65536, "SizeBufferDSPDAC": 65536,
+            "InputADC": [int(channel == 0) for channel in range(quantity_adc)],
+            "InputDiffADC": [0] * quantity_adc,
+            "HCPADC": [0] * quantity_adc,
+            "AmplifyADC": [list_amplify_adc[0]] * quantity_adc,
+            "PreAmplifyADC": [list_preamplify_adc[0]] * quantity_adc,
+            "DigitalResolChanADC": [resolution_adc] * quantity_adc,
+            "OutputDAC": [int(channel == 0) for channel in range(quantity_dac)],
+            "AttenDAC": [1.0] * quantity_dac,
+            "DigitalResolChanDAC": [resolution_dac] * quantity_dac,
+        }
+
+        self.speed = 1.0            # скорость хода времени модели относительно реального
+        self.opened = False
+        self.rings = {"ADC": _Ring(self, "ADC"), "DAC": _Ring(self, "DAC")}
+        self._stall = 0.0
+        self._flag_position = 0
+
+    def generate(self, frame: np.ndarray, number: np.ndarray) -> np.ndarray:
+        """Коды АЦП для отсчетов с номерами кадров frame и порядковыми
+        номерами включенных каналов number.
+        """
+
+        params = self.params
+        codes = np.zeros(len(frame))
+        for index, channel in enumerate(self.inputs()):
+            mask = number == index
+            scale = (params["AmplifyADC"][channel] * params["PreAmplifyADC"][channel] /
+                     params["DigitalResolChanADC"][channel])
+            codes[mask] = self.signal(frame[mask] / params["FreqADC"], channel) * scale
+        return codes
+
+    def inputs(self) -> list[int]:
+        """Номера включенных каналов АЦП."""
+
+        return [channel for channel, enable in enumerate(self.params["InputADC"]) if enable]
+
+    def number(self, kind: str) -> int:
+        """Количество включенных каналов АЦП или ЦАП."""
+
+        return sum(map(bool, self.params["InputADC" if kind == "ADC" else "OutputDAC"]))
+
+    def inject_overrun(self, stall: float | None = None) -> None:
+        """Задержать следующий опрос ZGetPointerADC на stall секунд (по
+        умолчанию - на время заполнения полутора буферов АЦП), имитируя
+        остановку программы, при которой запись обгоняет чтение.
+        """
+
+        ring = self.rings["ADC"]
+        if stall is None:
+            length = len(ring.array) if ring.array is not None else self.params["BufferSizeADC"]
+            stall = 1.5 * length / ring.nchannels / self.params["FreqADC"]
+        self._stall = stall
+
+    def pause(self, name: str) -> None:
+        """Выполнить задержку, заданную inject_overrun, перед опросом указателя АЦП."""
+
+        if self._stall and name == "ZGetPointerADC":
+            stall, self._stall = self._stall, 0.0
+            time.sleep(stall)
+
+    def call(self, name: str, args: tuple[Any, ...]) -> int:
+        """Выполнить функцию драйвера и вернуть код завершения."""
+
+        if name != "ZOpen" and not self.opened:
+            return NOT_OPEN
+
+        if (method := getattr(self, name, None)) is not None:
+            return method(*args) or 0
+
+        prefix, key = name[:4], name[4:]
+        try:
+            if prefix == "ZGet":
+                value = self.params[key]
+                _output(args[-1], value[_value(args[0])] if len(args) == 2 else value)
+            elif prefix == "ZSet":
+                if len(args) == 2:
+                    self.params[key][_value(args[0])] = _value(args[1])
+                else:
+                    self.params[key] = _value(args[0])
+                self.params["Modify"] += 1
+            elif prefix == "ZFin":
+                _output(args[0], self.params[name[1:]])
+        except (KeyError, IndexError):
+            return BAD_ARGUMENT
+
+        return 0
+
+# Подключение, версия, режимы
+
+    def ZOpen(self) -> None:
+        self.opened = True
+
+    def ZClose(self) -> None:
+        self.opened = False
+        for ring in self.rings.values():
+            ring.started = False
+
+    def ZInitDSP(self, filename: bytes) -> None:
+        pass
+
+    def ZResetDSP(self) -> None:
+        self.ZStopADC()
+        self.ZStopDAC()
+
+    def ZSetTypeADC(self) -> None:
+        pass
+
+    def ZSetTypeDAC(self) -> None:
+        pass
+
+    def ZGetVersion(self, dsp: Any, drv: Any, lib: Any) -> None:
+        dsp.value = drv.value = lib.value = b"simulator"
+
+    def ZGetNameDevice(self, name: Any, size: Any) -> None:
+        name.value = self.name[:_value(size) - 1]
+
+    def ZTestCode(self, *codes: Any) -> None:
+        pass
+
+# Частоты и коэффициенты усиления
+
+    def _get_list(self, key: str, index: Any, out: Any) -> int:
+        values = self.lists[key]
+        if not 0 <= _value(index) < len(values):
+            return BAD_ARGUMENT
+        _output(out, values[_value(index)])
+        return 0
+
+    def _nearest(self, key: str, value: float) -> float:
+        return min(self.lists[key], key=lambda item: abs(item - value))
+
+    def _next(self, key: str, current: float, step: int) -> float:
+        values = sorted(self.lists[key])
+        index = min(range(len(values)), key=lambda i: abs(values[i] - current))
+        return values[min(max(index + step, 0), len(values) - 1)]
+
+    def ZGetListFreqADC(self, index: Any, out: Any) -> int:
+        return self._get_list("FreqADC", index, out)
+
+    def ZGetListFreqDAC(self, index: Any, out: Any) -> int:
+        return self._get_list("FreqDAC", index, out)
+
+    def ZGetListAmplifyADC(self, index: Any, out: Any) -> int:
+        return self._get_list("AmplifyADC", index, out)
+
+    def ZGetListPreAmplifyADC(self, index: Any, out: Any) -> int:
+        return self._get_list("PreAmplifyADC", index, out)
+
+    def _set_freq(self, kind: str, freq: float, out: Any) -> int:
+        if self.rings[kind].started:
+            return BAD_ARGUMENT
+        self.params[f"Freq{kind}"] = self._nearest(f"Freq{kind}", freq)
+        self.params["Modify"] += 1
+        _output(out, self.params[f"Freq{kind}"])
+        return 0
+
+    def ZSetFreqADC(self, freq: Any, out: Any) -> int:
+        return self._set_freq("ADC", _value(freq), out)
+
+    def ZSetFreqDAC(self, freq: Any, out: Any) -> int:
+        return self._set_freq("DAC", _value(freq), out)
+
+    def ZSetNextFreqADC(self, step: Any, out: Any) -> int:
+        return self._set_freq("ADC", self._next("FreqADC", self.params["FreqADC"], _value(step)), out)
+
+    def ZSetNextFreqDAC(self, step: Any, out: Any) -> int:
+        return self._set_freq("DAC", self._next("FreqDAC", self.params["FreqDAC"], _value(step)), out)
+
+    def _set_channel(self, key: str, channel: Any, value: float, out: Any) -> int:
+        values = self.params[key]
+        if not 0 <= _value(channel) < len(values):
+            return BAD_ARGUMENT
+        values[_value(channel)] = value
+        self.params["Modify"] += 1
+        _output(out, value)
+        return 0
+
+    def ZSetAmplifyADC(self, channel: Any, amplify: Any, out: Any) -> int:
+        return self._set_channel("AmplifyADC", channel, self._nearest("AmplifyADC", _value(amplify)), out)
+
+    def ZSetPreAmplifyADC(self, channel: Any, amplify: Any, out: Any) -> int:
+        return self._set_channel("PreAmplifyADC", channel,
+                                 self._nearest("PreAmplifyADC", _value(amplify)), out)
+
+    def ZSetNextAmplifyADC(self, channel: Any, step: Any, out: Any) -> int:
+        current = self.params["AmplifyADC"][_value(channel)]
+        return self._set_channel("AmplifyADC", channel, self._next("AmplifyADC", current, _value(step)), out)
+
+    def ZSetNextPreAmplifyADC(self, channel: Any, step: Any, out: Any) -> int:
+        current = self.params["PreAmplifyADC"][_value(channel)]
+        return self._set_channel("PreAmplifyADC", channel,
+                                 self._next("PreAmplifyADC", current, _value(step)), out)
+
+    def ZSetAttenDAC(self, channel: Any, reduction: Any, out: Any) -> int:
+        return self._set_channel("AttenDAC", channel, min(max(_value(reduction), 0.0), 1.0), out)
+
+# Каналы
+
+    def ZGetFlag(self, out: Any) -> None:
+        """Флаг прерываний: 1, если с прошлого опроса поступила порция АЦП."""
+
+        position = self.rings["ADC"].position()
+        _output(out, int(position != self._flag_position))
+        self._flag_position = position
+
+    def ZGetNumberInputADC(self, out: Any) -> None:
+        _output(out, self.number("ADC"))
+
+    def ZGetNumberOutputDAC(self, out: Any) -> None:
+        _output(out, self.number("DAC"))
+
+# Буферы и указатели
+
+    def _get_buffer(self, kind: str, buff_ptr: Any, size: Any) -> None:
+        array = self.rings[kind].allocate()
+        buff_ptr._obj.contents = c_long.from_address(array.ctypes.data)
+        _output(size, len(array) * self.rings[kind].words)
+
+    def ZGetBufferADC(self, buff_ptr: Any, size: Any) -> None:
+        self._get_buffer("ADC", buff_ptr, size)
+
+    def ZGetBufferDAC(self, buff_ptr: Any, size: Any) -> None:
+        self._get_buffer("DAC", buff_ptr, size)
+
+    def ZRemBufferADC(self, buff_ptr: Any) -> None:
+        self.rings["ADC"].array = None
+
+    def ZRemBufferDAC(self, buff_ptr: Any) -> None:
+        self.rings["DAC"].array = None
+
+    def ZGetPointerADC(self, out: Any) -> None:
+        _output(out, self.rings["ADC"].pointer())
+
+    def ZGetPointerDAC(self, out: Any) -> None:
+        _output(out, self.rings["DAC"].pointer())
+
+    def ZGetLastDataADC(self, channel: Any, buff: Any, size: Any) -> int:
+        ring, channel, size = self.rings["ADC"], _value(channel), _value(size)
+        if ring.array is None or not _value(buff):
+            return NO_BUFFER
+        if channel not in self.inputs():
+            return BAD_ARGUMENT
+
+        position = ring.position()
+        ring.fill(position)
+        nchannels, number = ring.nchannels, self.inputs().index(channel)
+        index = (position - nchannels * np.arange(size, 0, -1) + number) % len(ring.array)
+        data = np.ascontiguousarray(ring.array[index])
+        memmove(_value(buff), data.ctypes.data, data.nbytes)
+        return 0
+
+    def _start(self, kind: str) -> int:
+        if self.rings[kind].array is None:
+            return NO_BUFFER
+        self.rings[kind].start()
+        self.params[f"Start{kind}"] = 1
+        return 0
+
+    def _stop(self, kind: str) -> None:
+        self.rings[kind].started = False
+        self.params[f"Start{kind}"] = 0
+
+    def ZStartADC(self) -> int:
+        return self._start("ADC")
+
+    def ZStartDAC(self) -> int:
+        return self._start("DAC")
+
+    def ZStopADC(self) -> None:
+        self._stop("ADC")
+
+    def ZStopDAC(self) -> None:
+        self._stop("DAC")
+
+# Цифровой порт и ШИМ
+
+    def _bits(self, key: str, mask: int, set: bool) -> None:
+        self.params[key] = self.params[key] | mask if set else self.params[key] & ~mask
+        self.params["Modify"] += 1
+
+    def ZSetBitDigOutEnable(self, bit: Any) -> None:
+        self._bits("DigOutEnable", 1 << _value(bit), True)
+
+    def ZClrBitDigOutEnable(self, bit: Any) -> None:
+        self._bits("DigOutEnable", 1 << _value(bit), False)
+
+    def ZSetBitMaskDigOutEnable(self, mask: Any) -> None:
+        self._bits("DigOutEnable", _value(mask), True)
+
+    def ZClrBitMaskDigOutEnable(self, mask: Any) -> None:
+        self._bits("DigOutEnable", _value(mask), False)
+
+    def ZSetBitDigOutput(self, bit: Any) -> None:
+        self._bits("DigOutput", 1 << _value(bit), True)
+
+    def ZClrBitDigOutput(self, bit: Any) -> None:
+        self._bits("DigOutput", 1 << _value(bit), False)
+
+    def ZSetBitMaskDigOutput(self, mask: Any) -> None:
+        self._bits("DigOutput", _value(mask), True)
+
+    def ZClrBitMaskDigOutput(self, mask: Any) -> None:
+        self._bits("DigOutput", _value(mask), False)
+
+    def ZStartPWM(self, *starts: Any) -> None:
+        pass
+
+    def ZStopPWM(self, *stops: Any) -> None:
+        pass
+
+    def ZSetFreqPWM(self, rate: Any, period: Any) -> None:
+        pass
+
+    def ZSetOnDutyPWM(self, *duties: Any) -> None:
+        pass
+
+    def ZRegulatorPWM(self, params: Any, out: Any) -> None:
+        pass
+
+
+class SimulatorBackend(Backend):
+    """Источник функций драйвера на основе моделей устройств.
+
+    devices - модели по адресам (тип устройства, DSP); по умолчанию одно
+    устройство ZET230 с DSP 0. Для остальных адресов ZOpen завершается
+    ошибкой, как для отсутствующего оборудования.
+    """
+
+    list_end = BAD_ARGUMENT
+
+    def __init__(self, devices: Mapping[Tuple[int, int], SimDevice] | None = None) -> None:
+        self.devices: Dict[Tuple[int, int], SimDevice] = (
+            {(Z_DEVICE.ZET230, 0): SimDevice()} if devices is None else dict(devices))
+        self._lock = threading.RLock()
+
+    def bind(self, name: str, prototype: _PyCFuncPtrType) -> Callable[..., int]:
+        return partial(self._call, name)
+
+    def _call(self, name: str, device: int, dsp: int, *args: Any) -> int:
+        if (model := self.devices.get((device, dsp))) is None:
+            return NO_DEVICE
+
+        model.pause(name)
+        with self._lock:
+            return model.call(name, args)
+
+
+class ReplayDevice(SimDevice):
+    """Модель устройства, выдающая через буфер АЦП данные записанного файла.
+
+    Частота, каналы, веса разрядов и коэффициенты усиления берутся из
+    заголовка записи. Данные воспроизводятся в темпе speed относительно
+    реального времени; по окончании записи выдаются нули или, при
+    loop=True, запись повторяется сначала. Каналы, отсутствующие в записи,
+    выдают нули.
+    """
+
+    def __init__(self, capture: CaptureReader, speed: float = 1.0, loop: bool = False) -> None:
+        header = capture.header
+        quantity = max(header.channels, default=-1) + 1
+        try:
+            name = Z_DEVICE(header.device).name.encode()
+        except ValueError:
+            name = b"ZET"
+
+        super().__init__(name, header.serial, quantity_adc=quantity, words_adc=header.words,
+                         list_freq_adc=(header.freq,),
+                         list_amplify_adc=tuple(sorted(set(header.amplify))) or (1.0,),
+                         list_preamplify_adc=tuple(sorted(set(header.preamplify))) or (1.0,))
+        self.capture = capture
+        self.speed = speed
+        self.loop = loop
+
+        params = self.params
+        params["BufferSizeADC"] = int(header.freq) * max(len(header.channels), 1) * header.words
+        for channel, resolution, amplify, preamplify in zip(header.channels, header.resolution,
+                                                            header.amplify, header.preamplify):
+            params["DigitalResolChanADC"][channel] = resolution
+            params["AmplifyADC"][channel] = amplify
+            params["PreAmplifyADC"][channel] = preamplify
+        params["InputADC"] = [int(channel in header.channels) for channel in range(quantity)]
+
+    def generate(self, frame: np.ndarray, number: np.ndarray) -> np.ndarray:
+        capture = self.capture
+        columns = np.array([capture.header.channels.index(channel)
+                            if channel in capture.header.channels else -1
+                            for channel in self.inputs()] or [-1])[number]
+        if self.loop and capture.frames:
+            frame = frame % capture.frames
+
+        valid = (frame < capture.frames) & (columns >= 0)
+        codes = np.zeros(len(frame), capture.raw.dtype)
+        codes[valid] = capture.raw[frame[valid], columns[valid]]
+        return codes
+
+
+class ReplayBackend(SimulatorBackend):
+    """Воспроизведение записанных файлов через функции драйвера.
+
+    Каждый файл становится устройством с типом и номером DSP из его
+    заголовка, так что код обработки работает с записью так же, как с
+    оборудованием (ZGetBufferADC, ZGetPointerADC и т.д.).
+    """
+
+    def __init__(self, paths: str | os.PathLike[str] | Iterable[str | os.PathLike[str]],
+                       speed: float = 1.0, loop: bool = False) -> None:
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+
+        devices: Dict[Tuple[int, int], ReplayDevice] = {}
+        for path in paths:
+            capture = CaptureReader(path)
+            devices[(capture.header.device, capture.header.dsp)] = ReplayDevice(capture, speed, loop)
+        super().__init__(devices)
+        self.replays = list(devices.values())
+
+    def close(self) -> None:
+        """Закрыть файлы записей."""
+
+        for device in self.replays:
+            device.capture.close()
+
+
+__all__ = ["ReplayBackend", "ReplayDevice", "SimDevice", "SimulatorBackend"]
@@ -0,0 +1,210 @@
+#! /usr/bin/env python3
+
+"""Спектральный анализ потока АЦП (метод Уэлча) и сводные показатели каналов."""
+
+from __future__ import annotations
+
+import inspect
+from typing import TYPE_CHECKING, Callable, Dict, Sequence, Union
+
+import numpy as np
+
+from zet.client import ZetError
+from zet.convert import Converter
+
+if TYPE_CHECKING:
+    from zet.stream import AdcStream, Block
+
+Window = Union[str, Sequence[float], np.ndarray]
+Bands = Sequence[Sequence[float]]
+
+_WINDOWS: Dict[str, Callable[[int], np.ndarray]] = {
+    "hann": np.hanning, "hamming": np.hamming, "blackman": np.blackman, "rect": np.ones}
+_rfft_out = "out" in inspect.signature(np.fft.rfft).parameters    # NumPy >= 2.0
+
+
+def get_window(name: Window, size: int) -> np.ndarray:
+    """Периодическое окно name длиной size или заданное массивом окно."""
+
+    if isinstance(name, str):
+        return _WINDOWS[name](size + 1)[:-1]
+    return np.asarray(name, dtype=np.float64)
+
+
+class SpectrumAnalyzer:
+    """Оценка спектральной плотности мощности методом Уэлча по мере
+    поступления данных.
+
+    Кадры накапливаются в сегменте длиной nfft; каждый заполненный сегмент
+    умножается на окно, преобразуется rfft и добавляется к среднему
+    (при averages=0 - арифметическому по всем сегментам, иначе -
+    экспоненциальному с постоянной averages сегментов), после чего
+    сегмент сдвигается на nfft - overlap кадров. Все массивы выделяются
+    при создании, поэтому расход памяти не зависит от длительности работы.
+    Одновременно для каждого канала накапливаются СКЗ, пик и пик-фактор.
+    """
+
+    def __init__(self, freq: float, nchannels: int, nfft: int = 4096, overlap: float = 0.5,
+                       window: Window = "hann", averages: int = 0) -> None:
+        self.freq = freq
+        self.nchannels = nchannels
+        self.nfft = nfft
+        # overlap - доля сегмента (float) или количество кадров (int)
+        self.overlap = int(nfft * overlap) if isinstance(overlap, float) else overlap
+        if not 0 <= self.overlap < nfft:
+            msg = f"overlap must be in [0, nfft) frames, got {self.overlap} for nfft={nfft}"
+            raise ZetError(msg)
+        self.averages = averages
+
+        taps = get_window(window, nfft)
+        self._window = taps[:, np.newaxis]
+        self._scale = 2.0 / (freq * np.sum(taps ** 2))  # односторонняя плотность, В^2/Гц
+
+        self.frequencies = np.fft.rfftfreq(nfft, 1.0 / freq)
+        self._segment = np.zeros((nfft, nchannels))
+        self._work = np.empty((nfft, nchannels))
+        self._spectrum = np.empty((nfft // 2 + 1, nchannels), np.complex128)
+        self._power = np.empty((nfft // 2 + 1, nchannels))
+        self._temp = np.empty((nfft // 2 + 1, nchannels))
+        self._psd = np.zeros((nfft // 2 + 1, nchannels))
+        self._fill = 0
+        self.segments = 0
+
+        self._sum_squares = np.zeros(nchannels)
+        self._peak = np.zeros(nchannels)
+        self._frames = 0
+
+    def process(self, x: np.ndarray, converter: Converter | None = None) -> int:
+        """Добавить кадры x формы (кадры, каналы) в вольтах (или коды АЦП,
+        если задан converter - они переводятся прямо в буфер сегмента).
+        Возвращает количество обработанных сегментов.
+        """
+
+        done = start = 0
+        while start < len(x):
+            count = min(len(x) - start, self.nfft - self._fill)
+            chunk = self._segment[self._fill:self._fill + count]
+            if converter is not None:
+                converter.convert(x[start:start + count], out=chunk)
+            else:
+                chunk[:] = x[start:start + count]
+            self._stats(chunk)
+
+            self._fill += count
+            start += count
+            if self._fill == self.nfft:
+                self._transform()
+                done += 1
+
+        return done
+
+    def feed(self, block: Block, converter: Converter) -> int:
+        """Добавить кадры блока АЦП, переводя коды в вольты."""
+
+        return sum(self.process(part, converter) for part in block.parts)
+
+    def psd(self) -> np.ndarray:
+        """Спектральная плотность мощности формы (частоты, каналы), В^2/Гц."""
+
+        return self._psd.copy()
+
+    def amplitude(self) -> np.ndarray:
+        """Амплитудный спектр (СКЗ в полосе каждого бина), В."""
+
+        return np.sqrt(self._psd * self.freq / self.nfft)
+
+    def band_energy(self, bands: Bands) -> np.ndarray:
+        """Мощность (В^2) в полосах [нижняя, верхняя) Гц формы (полосы, каналы)."""
+
+        step = self.freq / self.nfft
+        result = np.empty((len(bands), self.nchannels))
+        for number, (low, high) in enumerate(bands):
+            first, last = np.searchsorted(self.frequencies, (low, high))
+            result[number] = self._psd[first:last].sum(axis=0) * step
+        return result
+
+    def rms(self) -> np.ndarray:
+        """СКЗ каналов с момента создания или reset_stats(), В."""
+
+        return np.sqrt(self._sum_squares / self._frames) if self._frames else np.zeros(self.nchannels)
+
+    def peak(self) -> np.ndarray:
+        """Максимальное абсолютное значение каналов, В."""
+
+        return self._peak.copy()
+
+    def crest(self) -> np.ndarray:
+        """Пик-фактор каналов (пик / СКЗ)."""
+
+        rms = self.rms()
+        return np.divide(self._peak, rms, out=np.zeros_like(rms), where=rms > 0)
+
+    def reset(self) -> None:
+        """Начать усреднение спектра и накопление показателей заново."""
+
+        self._psd[:] = 0.0
+        self._fill = 0
+        self.segments = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Начать накопление СКЗ и пиков заново."""
+
+        self._sum_squares[:] = 0.0
+        self._peak[:] = 0.0
+        self._frames = 0
+
+    def _stats(self, chunk: np.ndarray) -> None:
+        self._sum_squares += np.einsum("fc,fc->c", chunk, chunk)
+        if len(chunk):
+            np.maximum(self._peak, chunk.max(axis=0), out=self._peak)
+            np.maximum(self._peak, -chunk.min(axis=0), out=self._peak)
+        self._frames += len(chunk)
+
+    def _transform(self) -> None:
+        np.multiply(self._segment, self._window, out=self._work)
+        if _rfft_out:
+            np.fft.rfft(self._work, axis=0, out=self._spectrum)
+        else:
+            self._spectrum[:] = np.fft.rfft(self._work, axis=0)
+
+        power = self._power
+        np.multiply(self._spectrum.real, self._spectrum.real, out=power)
+        power += np.square(self._spectrum.imag, out=self._temp)
+        power *= self._scale
+        power[0] /= 2.0
+        if self.nfft % 2 == 0:
+            power[-1] /= 2.0
+
+        self.segments += 1
+        weight = 1.0 / (min(self.segments, self.averages) if self.averages else self.segments)
+        np.subtract(power, self._psd, out=self._temp)
+        self._temp *= weight
+        self._psd += self._temp
+
+        # Перекрытие: последние overlap кадров становятся началом сегмента
+        self._segment[:self.overlap] = self._segment[self.nfft - self.overlap:]
+        self._fill = self.overlap
+
+
+class LiveSpectrum(SpectrumAnalyzer):
+    """Анализатор, получающий данные из потока АЦП (update)."""
+
+    def __init__(self, stream: AdcStream, nfft: int = 4096, overlap: float = 0.5,
+                       window: Window = "hann", averages: int = 0,
+                       converter: Converter | None = None) -> None:
+        super().__init__(stream.rate / stream.nchannels, stream.nchannels, nfft, overlap,
+                         window, averages)
+        self.stream = stream
+        self.converter = converter or Converter.from_device(stream.zdev, stream.channels)
+
+    def update(self) -> int:
+        """Обработать все новые данные потока; возвращает число новых сегментов."""
+
+        done = 0
+        while (block := self.stream.read()) is not None:
+            done += self.feed(block, self.converter)
+        return done
+
+
+__all__ = ["LiveSpectrum", "SpectrumAnalyzer", "get_window"]
@@ -0,0 +1,365 @@
+#! /usr/bin/env python3
+
+"""Потоковое чтение данных АЦП из кольцевого буфера драйвера."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Callable, Iterator
+
+import numpy as np
+
+from zet.client import ZetError
+
+if TYPE_CHECKING:
+    from zet.client import ZET, RingBuffer
+
+
+class OverrunError(ZetError):
+    """Запись драйвера обогнала чтение на целый круг буфера, данные потеряны."""
+
+    def __init__(self, msg: str, lost: int) -> None:
+        super().__init__(msg)
+        self.lost = lost
+
+
+class RingPointer:
+    """Позиция указателя драйвера в кольцевом буфере без учета переходов
+    через его конец (в отсчетах от начала работы).
+
+    Полные круги указателя между опросами восстанавливаются по скорости
+    rate (отсчетов в секунду), поэтому опрашивать указатель следует чаще,
+    чем буфер проходится наполовину.
+    """
+
+    __slots__ = ("get", "length", "pointer", "position", "rate", "time", "words")
+
+    def __init__(self, get: Callable[[], int], words: int, length: int, rate: float) -> None:
+        self.get = get
+        self.words = words
+        self.length = length
+        self.rate = rate
+        self.pointer = get() // words
+        self.time = time.perf_counter()
+        self.position = self.pointer
+
+    def update(self) -> int:
+        """Опросить указатель и вернуть его позицию."""
+
+        pointer = self.get() // self.words
+        now = time.perf_counter()
+
+        advance = (pointer - self.pointer) % self.length
+        expected = (now - self.time) * self.rate
+        if expected > self.length / 2:
+            # Указатель мог пройти несколько полных кругов между опросами
+            advance += self.length * round((expected - advance) / self.length)
+
+        self.pointer = pointer
+        self.time = now
+        self.position += advance
+        return self.position
+
+
+class Block:
+    """Непрерывный участок данных АЦП, разделенный на кадры по каналам.
+
+    parts содержит один или несколько массивов формы (кадры, каналы),
+    отображенных на буфер драйвера без копирования; скопирован может быть
+    только кадр, разорванный концом кольцевого буфера. Данные действительны,
+    пока драйвер не перезапишет этот участок буфера.
+    """
+
+    __slots__ = ("channels", "index", "lost", "parts", "time")
+
+    def __init__(self, parts: tuple[np.ndarray, ...], index: int, channels: tuple[int, ...],
+                       lost: int = 0, time: float = 0.0) -> None:
+        self.parts = parts
+        self.index = index          # номер первого кадра от начала чтения
+        self.channels = channels    # номера включенных каналов АЦП
+        self.lost = lost            # кадров потеряно перед этим блоком
+        self.time = time            # время опроса указателя (time.perf_counter)
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self.parts)
+
+    def channel(self, number: int) -> tuple[np.ndarray, ...]:
+        """Отсчеты канала с порядковым номером number среди включенных."""
+
+        return tuple(part[:, number] for part in self.parts)
+
+    def data(self) -> np.ndarray:
+        """Копия блока в виде одного массива формы (кадры, каналы)."""
+
+        return np.concatenate(self.parts)
+
+
+class AdcStream:
+    """Итератор по новым данным в кольцевом буфере АЦП.
+
+    Отслеживает позицию чтения, обрабатывает переход через конец буфера и
+    обнаруживает переполнение, когда запись обгоняет чтение на круг. При
+    resync=False переполнение возбуждает OverrunError, иначе чтение
+    продолжается с текущей позиции записи, а в следующем блоке
+    указывается число потерянных кадров.
+
+    Чтение начинается с позиции записи на момент первого опроса; позиция
+    записи между опросами восстанавливается по частоте дискретизации
+    (см. RingPointer).
+
+    Ожидание данных (wait_for_samples, итерация, wake_time для внешних
+    циклов ожидания) рассчитывается по моменту поступления очередной
+    порции драйвера: margin - задержка пробуждения
+    после расчетного момента (меньше опросов впустую, больше задержка),
+    spin - интервал перед расчетным моментом, в течение которого вместо
+    сна опрашивается флаг прерываний ZGetFlag (меньше задержка, больше
+    загрузка процессора).
+    """
+
+    def __init__(self, zdev: ZET, buff: RingBuffer | None = None, min_frames: int = 1,
+                       max_frames: int | None = None, resync: bool = False,
+                       margin: float = 0.0, spin: float = 0.0, min_sleep: float = 0.0005) -> None:
+        self.zdev = zdev
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.resync = resync
+        self.margin = margin
+        self.spin = spin
+        self.min_sleep = min_sleep
+        self.overruns = 0
+        self.metrics = zdev.metrics     # показатели отставания и переполнений
+
+        self._owner = buff is None
+        self.buff = zdev.get_buffer_adc() if buff is None else buff
+        self.words = self.buff.words
+        self.channels = tuple(channel for channel in range(zdev.ZGetQuantityChannelADC())
+                                      if zdev.ZGetInputADC(channel))
+        self.nchannels = zdev.ZGetNumberInputADC()
+        self.rate = zdev.ZGetFreqADC() * self.nchannels     # отсчетов в секунду
+
+        self._array: np.ndarray | None = self.buff.array
+        self._length = len(self._array)
+        self._writer: RingPointer | None = None     # создается при первом опросе
+        self._read = 0              # конец выданных данных
+        self._held = 0              # начало последнего выданного блока
+        self._lost = 0
+
+        self.packet = self._packet()    # кадров в порции данных драйвера
+        self.waits = 0              # вызовов wait_for_samples
+        self.wakeups = 0            # опросов указателя при ожидании
+        self.timeouts = 0
+        self.jitter_max = 0.0       # макс. опоздание пробуждения, с
+        self._jitter_sum = 0.0
+        self._sleeps = 0
+        self._landed = 0.0          # время опроса, обнаружившего новую порцию
+        self._flag: bool | None = None  # поддержка ZGetFlag (None - не проверялась)
+
+    def __iter__(self) -> Iterator[Block]:
+        return self
+
+    def __next__(self) -> Block:
+        while (block := self.read()) is None:
+            self.wait_for_samples(self.min_frames)
+        return block
+
+    def close(self) -> None:
+        """Освободить буфер АЦП, если он был запрошен самим потоком."""
+
+        self._array = None
+        if self._owner and not self.buff.released:
+            self.zdev.ZRemBufferADC(self.buff)
+
+    @property
+    def lag(self) -> int:
+        """Отставание чтения от записи (в отсчетах) на момент последнего опроса."""
+
+        return self._writer.position - self._read if self._writer else 0
+
+    def wait_for_samples(self, n: int, timeout: float | None = None) -> int:
+        """Ожидать, пока для чтения не будет доступно n кадров.
+
+        Между опросами указателя поток спит до расчетного момента
+        поступления порции драйвера, содержащей n-ый кадр. Возвращает
+        число доступных кадров (меньше n, если истек timeout секунд).
+        """
+
+        self.waits += 1
+        now = time.perf_counter()
+        expires = None if timeout is None else now + timeout
+
+        while True:
+            frames = self.poll()
+            self.wakeups += 1
+            if frames >= n:
+                return frames
+
+            now = time.perf_counter()
+            if expires is not None and now >= expires:
+                self.timeouts += 1
+                return frames
+
+            wake = self._predict(n - frames, now) + self.margin
+            self._sleep_until(wake if expires is None else min(wake, expires))
+
+    def wake_time(self, n: int) -> float:
+        """Расчетный момент (time.perf_counter), когда для чтения будет
+        доступно n кадров, по состоянию на последний опрос указателя.
+        """
+
+        frames = self.lag // self.nchannels
+        return self._predict(max(n - frames, 1), time.perf_counter()) + self.margin
+
+    def wait_stats(self) -> dict[str, float]:
+        """Счетчики ожидания и статистика опоздания пробуждений."""
+
+        return {"waits": self.waits,
+                "wakeups": self.wakeups,
+                "timeouts": self.timeouts,
+                "packet": self.packet,
+                "jitter_mean": self._jitter_sum / self._sleeps if self._sleeps else 0.0,
+                "jitter_max": self.jitter_max}
+
+    def poll(self) -> int:
+        """Опросить указатель записи и вернуть число доступных для чтения кадров."""
+
+        if self._writer is None:
+            # Чтение начинается с текущей позиции записи
+            self._writer = RingPointer(self.zdev.ZGetPointerADC, self.words, self._length, self.rate)
+            self._read = self._held = self._writer.position - self._writer.position % self.nchannels
+            self._landed = self._writer.time
+            return 0
+
+        previous = self._writer.position
+        write = self._writer.update()
+        if write != previous:
+            self._landed = self._writer.time
+
+        if write - self._held > self._length:
+            # Чтение продолжается с позиции записи, непрочитанные кадры теряются
+            lost = (write - self._read) // self.nchannels
+            self._read = self._held = self._read + lost * self.nchannels
+            self.overruns += 1
+            if self.metrics is not None:
+                self.metrics.count("adc.overruns")
+                self.metrics.count("adc.lost", lost)
+
+            if not self.resync:
+                msg = f"ADC ring buffer overrun, {lost} frame(s) lost"
+                raise OverrunError(msg, lost)
+            self._lost += lost
+
+        if self.metrics is not None:
+            self.metrics.gauge("adc.lag", write - self._read)
+        return (write - self._read) // self.nchannels
+
+    def read(self) -> Block | None:
+        """Вернуть блок новых данных без ожидания или None, если их мало."""
+
+        frames = self.poll()
+        if frames < self.min_frames or self._writer is None:
+            return None
+        if self.max_frames is not None:
+            frames = min(frames, self.max_frames)
+
+        start, stop = self._read, self._read + frames * self.nchannels
+        block = Block(self._slice(start, stop), start // self.nchannels,
+                      self.channels, self._lost, self._writer.time)
+
+        self._held, self._read, self._lost = start, stop, 0
+        return block
+
+    def window(self, start: int, stop: int) -> tuple[np.ndarray, ...]:
+        """Представления кадров [start, stop) (в нумерации Block.index) в буфере.
+
+        Кадры должны быть уже записаны драйвером и еще не перезаписаны по
+        состоянию на последний опрос указателя.
+        """
+
+        first, last = start * self.nchannels, stop * self.nchannels
+        write = self._writer.position if self._writer is not None else 0
+        if first < write - self._length or last > write or first > last:
+            msg = f"frames {start}..{stop} are not in the ADC ring buffer"
+            raise ZetError(msg)
+
+        return self._slice(first, last)
+
+    def _packet(self) -> int:
+        """Размер порции данных драйвера в кадрах: размер прерывания АЦП
+        или, если он не поддерживается, размер пакета DSP, умноженный на
+        количество пакетов за прерывание.
+        """
+
+        try:
+            samples = self.zdev.ZGetInterruptADC() // self.words
+        except ZetError:
+            samples = 0
+
+        if not samples:
+            try:
+                samples = self.zdev.ZGetSizePacketADC() * max(self.zdev.ZGetQuantityPacketsADC(), 1)
+            except ZetError:
+                samples = 0
+
+        return max(samples // self.nchannels, 1)
+
+    def _predict(self, frames: int, now: float) -> float:
+        """Расчетный момент поступления еще frames кадров."""
+
+        packets = -(-frames // self.packet)
+        wake = self._landed + packets * self.packet * self.nchannels / self.rate
+        return wake if wake > now else now + self.min_sleep
+
+    def _sleep_until(self, wake: float) -> None:
+        """Спать до момента wake; последние spin секунд опрашивать ZGetFlag."""
+
+        if (delay := wake - time.perf_counter() - self.spin) > 0:
+            time.sleep(delay)
+
+        if self.spin > 0:
+            if self._flag is None:
+                try:
+                    self.zdev.ZGetFlag()
+                    self._flag = True
+                except ZetError:
+                    self._flag = False
+
+            while time.perf_counter() < wake:
+                if self._flag and self.zdev.ZGetFlag():
+                    break
+
+        late = time.perf_counter() - wake
+        self._sleeps += 1
+        self._jitter_sum += late
+        self.jitter_max = max(self.jitter_max, late)
+        if self.metrics is not None:
+            self.metrics.histogram("adc.wake_late").record(max(int(late * 1e9), 0))
+
+    def _slice(self, start: int, stop: int) -> tuple[np.ndarray, ...]:
+        """Представления участка [start, stop) кольцевого буфера по кадрам."""
+
+        array, length, nchannels = self._array, self._length, self.nchannels
+        if array is None:
+            msg = "stream is closed"
+            raise ZetError(msg)
+        if self.buff.released:
+            msg = "ADC buffer has been released"
+            raise ZetError(msg)
+        parts = []
+
+        while start < stop:
+            offset = start % length
+            whole = min(stop - start, length - offset) // nchannels * nchannels
+            if whole:
+                parts.append(array[offset:offset + whole].reshape(-1, nchannels))
+                start += whole
+            else:
+                # Кадр разорван концом буфера - копируется только он
+                tail = array[offset:]
+                head = array[:nchannels - len(tail)]
+                parts.append(np.concatenate((tail, head)).reshape(1, nchannels))
+                start += nchannels
+
+        return tuple(parts)
+
+
+__all__ = ["AdcStream", "Block", "OverrunError", "RingPointer"]
@@ -0,0 +1,281 @@
+#! /usr/bin/env python3
+
+"""Запись по событиям (триггерам) с пред- и постисторией."""
+
+from __future__ import annotations
+
+import collections
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+from zet.client import ZetError
+from zet.convert import Converter
+
+if TYPE_CHECKING:
+    from zet.stream import AdcStream
+
+
+class Trigger(ABC):
+    """Условие запуска по одному каналу АЦП (номер канала устройства).
+
+    scan(x) получает очередные значения канала в вольтах и возвращает
+    индексы отсчетов, на которых условие становится истинным; состояние
+    между вызовами сохраняется, поэтому событие на границе блоков не
+    теряется и не повторяется.
+    """
+
+    def __init__(self, channel: int) -> None:
+        self.channel = channel
+        self.freq = 0.0             # частота дискретизации (задается TriggerEngine)
+        self._state = False         # значение условия на последнем отсчете
+        self._last: float | None = None
+
+    def reset(self) -> None:
+        """Забыть предыдущие значения сигнала."""
+
+        self._state = False
+        self._last = None
+
+    @abstractmethod
+    def condition(self, x: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """Значения условия для отсчетов x (previous - предыдущие отсчеты)."""
+
+    def scan(self, x: np.ndarray) -> np.ndarray:
+        if not len(x):
+            return np.empty(0, np.intp)
+
+        previous = np.empty_like(x)
+        previous[0] = x[0] if self._last is None else self._last
+        previous[1:] = x[:-1]
+
+        condition = self.condition(x, previous)
+        before = np.empty_like(condition)
+        before[0] = self._state
+        before[1:] = condition[:-1]
+
+        self._state = bool(condition[-1])
+        self._last = x[-1]
+        return np.flatnonzero(condition & ~before)
+
+
+class Level(Trigger):
+    """Сигнал стал выше (above=True) или ниже уровня level."""
+
+    def __init__(self, channel: int, level: float, above: bool = True) -> None:
+        super().__init__(channel)
+        self.level = level
+        self.above = above
+
+    def condition(self, x: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        return x >= self.level if self.above else x <= self.level
+
+
+class Edge(Trigger):
+    """Переход сигнала через уровень level по фронту (rising=True) или спаду.
+
+    Повторный запуск возможен только после возврата сигнала за уровень
+    level -/+ hysteresis, что исключает срабатывания от шума.
+    """
+
+    def __init__(self, channel: int, level: float, rising: bool = True,
+                       hysteresis: float = 0.0) -> None:
+        super().__init__(channel)
+        self.level = level
+        self.rising = rising
+        self.hysteresis = hysteresis
+        self._mark = 0              # 1 - сигнал за уровнем, -1 - перед ним (с гистерезисом)
+
+    def reset(self) -> None:
+        super().reset()
+        self._mark = 0
+
+    def condition(self, x: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        """Сигнал за уровнем level (без гистерезиса, который учитывает scan)."""
+
+        return x >= self.level if self.rising else x <= self.level
+
+    def scan(self, x: np.ndarray) -> np.ndarray:
+        if not len(x):
+            return np.empty(0, np.intp)
+
+        if not self.rising:
+            x, level = -x, -self.level
+        else:
+            level = self.level
+        below = x <= level - self.hysteresis if self.hysteresis else x < level
+        marks = np.where(x >= level, 1, np.where(below, -1, 0))
+
+        # Последняя ненулевая отметка на каждом отсчете (с учетом прошлого блока)
+        index = np.where(marks != 0, np.arange(len(marks)), -1)
+        np.maximum.accumulate(index, out=index)
+        filled = np.where(index >= 0, marks[index], self._mark)
+
+        before = np.empty_like(filled)
+        before[0] = self._mark
+        before[1:] = filled[:-1]
+
+        self._mark = int(filled[-1])
+        return np.flatnonzero((filled == 1) & (before == -1))
+
+
+class Slope(Trigger):
+    """Скорость изменения сигнала превысила slope В/с (для rising=False -
+    скорость спада).
+    """
+
+    def __init__(self, channel: int, slope: float, rising: bool = True) -> None:
+        super().__init__(channel)
+        self.slope = abs(slope)
+        self.rising = rising
+
+    def condition(self, x: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        delta = (x - previous) * self.freq
+        return delta >= self.slope if self.rising else delta <= -self.slope
+
+
+class Window(Trigger):
+    """Сигнал вышел за пределы [low, high] (inside=True - вошел в них)."""
+
+    def __init__(self, channel: int, low: float, high: float, inside: bool = False) -> None:
+        super().__init__(channel)
+        self.low = low
+        self.high = high
+        self.inside = inside
+
+    def condition(self, x: np.ndarray, previous: np.ndarray) -> np.ndarray:
+        within = (x >= self.low) & (x <= self.high)
+        return within if self.inside else ~within
+
+
+class TriggerEvent:
+    """Событие запуска и окно данных вокруг него."""
+
+    __slots__ = ("data", "frame", "pre", "time", "trigger")
+
+    def __init__(self, trigger: Trigger, frame: int, time: float, data: np.ndarray,
+                       pre: int) -> None:
+        self.trigger = trigger
+        self.frame = frame          # номер кадра запуска (как Block.index)
+        self.time = time            # время запуска от первого прочитанного кадра, с
+        self.data = data            # коды АЦП формы (кадры, каналы)
+        self.pre = pre              # кадров предыстории в data
+
+
+class TriggerEngine:
+    """Обнаружение событий в потоке АЦП и выделение окон данных.
+
+    Каждый новый блок потока проверяется всеми условиями векторно. Для
+    события берется pre кадров до и post кадров после запуска прямо из
+    кольцевого буфера (копируется только окно), когда постистория будет
+    записана. После события новые запуски не принимаются holdoff кадров;
+    при rearm=False после события движок выключается до вызова arm().
+    Готовые события накапливаются в очереди events (не более max_events,
+    лишние отбрасываются со счетчиком dropped).
+    """
+
+    def __init__(self, stream: AdcStream, triggers: Trigger | Iterable[Trigger], pre: int,
+                       post: int, holdoff: int = 0, rearm: bool = True,
+                       max_events: int = 1000) -> None:
+        self.stream = stream
+        self.triggers = (triggers,) if isinstance(triggers, Trigger) else tuple(triggers)
+        self.pre = pre
+        self.post = post
+        self.holdoff = holdoff
+        self.rearm = rearm
+        self.max_events = max_events
+
+        frames = len(stream.buff) // stream.nchannels
+        if pre + post > frames // 2:
+            msg = f"trigger window of {pre + post} frames does not fit the ADC buffer ({frames} frames)"
+            raise ZetError(msg)
+
+        self.freq = stream.rate / stream.nchannels
+        converter = Converter.from_device(stream.zdev, stream.channels)
+        self._columns = []
+        for trigger in self.triggers:
+            number = stream.channels.index(trigger.channel)
+            trigger.freq = self.freq
+            self._columns.append((trigger, number, converter.scale[number], converter.offset[number]))
+
+        self.armed = True
+        self.events: collections.deque[TriggerEvent] = collections.deque()
+        self.dropped = 0            # не поместилось в очередь
+        self.missed = 0             # окно уже перезаписано или начинается до начала чтения
+        self._pending: collections.deque[tuple[int, Trigger]] = collections.deque()
+        self._first: int | None = None  # первый прочитанный кадр
+        self._end = 0               # конец прочитанных кадров
+        self._quiet = 0             # кадр окончания запрета (holdoff)
+
+    def arm(self) -> None:
+        """Разрешить следующий запуск."""
+
+        self.armed = True
+
+    def process(self) -> int:
+        """Прочитать новые данные потока, найти события и выделить окна
+        событий, для которых получена постистория. Возвращает количество
+        событий, добавленных в очередь.
+        """
+
+        if (block := self.stream.read()) is not None:
+            if self._first is None:
+                self._first = block.index
+            self._scan(block.parts, block.index)
+            self._end = block.index + len(block)
+            block = None
+
+        return self._collect()
+
+    def pop(self) -> TriggerEvent | None:
+        """Взять из очереди самое раннее событие."""
+
+        return self.events.popleft() if self.events else None
+
+    def _scan(self, parts: tuple[np.ndarray, ...], index: int) -> None:
+        for part in parts:
+            found: list[tuple[int, Trigger]] = []
+            for trigger, number, scale, offset in self._columns:
+                x = part[:, number] * scale + offset
+                found.extend((index + int(position), trigger) for position in trigger.scan(x))
+
+            for frame, trigger in sorted(found, key=lambda item: item[0]):
+                if self.armed and frame >= self._quiet:
+                    self._pending.append((frame, trigger))
+                    self._quiet = frame + max(self.holdoff, 1)
+                    self.armed = self.rearm
+
+            index += len(part)
+
+    def _collect(self) -> int:
+        if (first := self._first) is None:
+            return 0
+
+        added = 0
+        while self._pending and self._pending[0][0] + self.post <= self._end:
+            frame, trigger = self._pending.popleft()
+            start = frame - self.pre
+            if start < first:
+                self.missed += 1
+                continue
+
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                continue
+
+            try:
+                parts = self.stream.window(start, frame + self.post)
+            except ZetError:
+                # Чтение отстает от записи, и драйвер уже перезаписал окно
+                self.missed += 1
+                continue
+            data = np.concatenate(parts)
+            self.events.append(TriggerEvent(trigger, frame, (frame - first) / self.freq,
+                                            data, self.pre))
+            added += 1
+
+        return added
+
+
+__all__ = ["Edge", "Level", "Slope", "Trigger", "TriggerEngine", "TriggerEvent", "Window"]